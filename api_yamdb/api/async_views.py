@@ -0,0 +1,61 @@
+import functools
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from rest_framework.permissions import SAFE_METHODS
+
+# Маршруты каталога и отзывов, которые читаются без блокировки
+# общего потока ASGI-сервера.
+ASYNC_READ_ROUTES = (
+    'titles-list',
+    'titles-detail',
+    'titles-search',
+    'genres-list',
+    'categories-list',
+    'reviews-list',
+    'reviews-detail',
+    'comments-list',
+    'comments-detail',
+)
+
+
+def async_read_view(view):
+    """
+    Асинхронная обёртка над синхронной вьюхой DRF.
+
+    Под ASGI Django выполняет синхронные вьюхи в одном общем потоке,
+    и медленный запрос задерживает остальные. Чтение выполняется
+    в пуле потоков (thread_sensitive=False), изменения - как раньше,
+    в общем потоке. Потоки пула открывают свои соединения с базой,
+    поэтому устаревшие соединения закрываются до и после запроса.
+    """
+
+    def read(request, *args, **kwargs):
+        close_old_connections()
+        try:
+            response = view(request, *args, **kwargs)
+            return response.render()
+        finally:
+            close_old_connections()
+
+    read_in_pool = sync_to_async(read, thread_sensitive=False)
+    write = sync_to_async(view, thread_sensitive=True)
+
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method in SAFE_METHODS:
+            return await read_in_pool(request, *args, **kwargs)
+        return await write(request, *args, **kwargs)
+
+    return wrapper
+
+
+def async_read_patterns(patterns):
+    """Обёртка маршрутов из ASYNC_READ_ROUTES, если включено ASYNC_VIEWS."""
+    if not settings.ASYNC_VIEWS:
+        return patterns
+    for pattern in patterns:
+        if pattern.name in ASYNC_READ_ROUTES:
+            pattern.callback = async_read_view(pattern.callback)
+    return patterns
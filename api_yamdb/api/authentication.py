@@ -0,0 +1,130 @@
+from typing import Optional
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.authentication import (
+    JWTAuthentication,
+    JWTStatelessUserAuthentication,
+)
+from rest_framework_simplejwt.exceptions import (
+    AuthenticationFailed,
+    InvalidToken,
+)
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from users.models import ADMIN, MODERATOR, USER, User
+
+ROLE_CLAIM = 'role'
+VERSION_CLAIM = 'ver'
+TOKEN_VERSION_KEY = 'auth:token_version:{user_id}'
+
+
+class RoleAccessToken(AccessToken):
+    """Токен доступа с ролью пользователя в полезной нагрузке."""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token[ROLE_CLAIM] = user.role
+        token[VERSION_CLAIM] = user.token_version
+        token['username'] = user.username
+        token['is_staff'] = user.is_staff
+        token['is_superuser'] = user.is_superuser
+        return token
+
+
+class UserPrincipal(TokenUser):
+    """
+    Пользователь, восстановленный из токена без запроса к базе.
+
+    Поддерживает проверки ролей, которые используют права доступа.
+    """
+
+    @cached_property
+    def role(self):
+        return self.token.get(ROLE_CLAIM, USER)
+
+    @property
+    def is_user(self):
+        return self.role == USER
+
+    @property
+    def is_moderator(self):
+        return self.role == MODERATOR
+
+    @property
+    def is_admin(self):
+        return self.role == ADMIN or self.is_superuser
+
+
+def token_version(user_id) -> Optional[int]:
+    """
+    Версия токенов пользователя, None - пользователь удалён.
+
+    Хранится в User.token_version, кэш держит её без срока
+    и при промахе заполняется из базы.
+    """
+    key = TOKEN_VERSION_KEY.format(user_id=user_id)
+    version = cache.get(key)
+    if version is None:
+        version = User.objects.filter(pk=user_id).values_list(
+            'token_version', flat=True,
+        ).first()
+        if version is not None:
+            cache.add(key, version, timeout=None)
+    return version
+
+
+def revoke_user_tokens(user_id) -> Optional[int]:
+    """
+    Отзыв всех выданных пользователю токенов.
+
+    Версия токенов пользователя увеличивается в базе, токены
+    с меньшей версией отклоняются. Сравнение по версии, а не
+    по времени выдачи: iat округлён до секунды. Ключ кэша
+    удаляется сразу и после коммита: значение, прочитанное
+    другим запросом до коммита, не переживёт его.
+    Возвращает новую версию.
+    """
+    users = User.objects.filter(pk=user_id)
+    users.update(token_version=F('token_version') + 1)
+    forget_token_version(user_id)
+    return users.values_list('token_version', flat=True).first()
+
+
+def forget_token_version(user_id) -> None:
+    """Следующая проверка токена прочитает версию из базы."""
+    key = TOKEN_VERSION_KEY.format(user_id=user_id)
+    cache.delete(key)
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+def is_revoked(token) -> bool:
+    version = token_version(token[api_settings.USER_ID_CLAIM])
+    return version is None or token.get(VERSION_CLAIM, 0) < version
+
+
+class StatelessJWTAuthentication(JWTStatelessUserAuthentication):
+    """
+    Аутентификация по JWT без загрузки пользователя из базы.
+
+    Роль и id пользователя берутся из токена. Токены, выданные
+    до изменения роли, блокировки или удаления пользователя,
+    отклоняются по версии токенов пользователя. Токены без роли,
+    выданные до включения режима, проверяются по базе.
+    """
+
+    def get_user(self, validated_token):
+        if ROLE_CLAIM not in validated_token:
+            return JWTAuthentication.get_user(self, validated_token)
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken('Токен не содержит id пользователя')
+        if is_revoked(validated_token):
+            raise AuthenticationFailed(
+                'Токен отозван', code='token_revoked',
+            )
+        return UserPrincipal(validated_token)
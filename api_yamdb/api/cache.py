@@ -0,0 +1,148 @@
+import hashlib
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.cache import get_conditional_response, quote_etag
+from rest_framework.response import Response
+
+CACHE_PREFIX = 'api'
+
+CATEGORIES = 'categories'
+GENRES = 'genres'
+TITLES = 'titles'
+# Имена пользователей выводятся в отзывах и комментариях.
+AUTHORS = 'authors'
+
+
+def reviews_scope(title_id) -> str:
+    return f'reviews:{title_id}'
+
+
+def comments_scope(review_id) -> str:
+    return f'comments:{review_id}'
+
+
+def _version_key(scope: str) -> str:
+    return f'{CACHE_PREFIX}:version:{scope}'
+
+
+def get_versions(*scopes: str) -> dict:
+    """
+    Версии областей кэша.
+
+    Версия - время последнего изменения данных области.
+    Если версии ещё нет в кэше, она создаётся текущим временем.
+    """
+    keys = {_version_key(scope): scope for scope in scopes}
+    versions = cache.get_many(keys)
+    missing = {key: time.time() for key in keys if key not in versions}
+    for key, version in missing.items():
+        cache.add(key, version, timeout=None)
+    if missing:
+        versions.update(cache.get_many(missing))
+    return {keys[key]: version for key, version in versions.items()}
+
+
+def invalidate(*scopes: str) -> None:
+    """
+    Сброс кэша областей: все прежние ключи становятся недоступны.
+
+    Версии меняются сразу и ещё раз после коммита транзакции:
+    ответ, собранный параллельным запросом по данным до коммита,
+    сохраняется под версией, которая к тому времени устарела.
+    """
+    _bump_versions(scopes)
+    transaction.on_commit(lambda: _bump_versions(scopes))
+
+
+def _bump_versions(scopes) -> None:
+    now = time.time()
+    cache.set_many(
+        {_version_key(scope): now for scope in scopes},
+        timeout=None,
+    )
+
+
+def response_signature(request, versions: dict) -> str:
+    """
+    Подпись ответа.
+
+    Строится по адресу запроса, отсортированным параметрам
+    и версиям областей, от которых зависит ответ.
+    """
+    query = urlencode(sorted(request.GET.lists()), doseq=True)
+    signature = '|'.join(
+        [request.build_absolute_uri(request.path), query]
+        + [f'{scope}={versions[scope]!r}' for scope in sorted(versions)]
+    )
+    return hashlib.md5(signature.encode()).hexdigest()
+
+
+class ConditionalResponseMixin:
+    """
+    Заголовок ETag для list и retrieve.
+
+    ETag строится по версиям областей cache_scopes, поэтому ответ
+    304 на If-None-Match отдаётся без запросов к базе и сериализации.
+    Last-Modified не отдаётся: с точностью до секунды он не отличает
+    две записи в одну секунду, и If-Modified-Since получал бы 304
+    с устаревшими данными.
+    """
+
+    cache_scopes = ()
+
+    def get_cache_scopes(self):
+        return self.cache_scopes
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().list, request, *args, **kwargs,
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().retrieve, request, *args, **kwargs,
+        )
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        versions = get_versions(*self.get_cache_scopes())
+        signature = response_signature(request, versions)
+        if not versions:
+            return self.build_response(
+                signature, handler, request, *args, **kwargs,
+            )
+        etag = quote_etag(signature)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = self.build_response(
+                signature, handler, request, *args, **kwargs,
+            )
+            if response.status_code != 200:
+                return response
+        response['ETag'] = etag
+        return response
+
+    def build_response(self, signature, handler, request, *args, **kwargs):
+        return handler(request, *args, **kwargs)
+
+
+class CachedResponseMixin(ConditionalResponseMixin):
+    """
+    Кэширование ответов list и retrieve.
+
+    cache_scopes - области кэша, изменение которых
+    делает сохранённые ответы устаревшими.
+    """
+
+    def build_response(self, signature, handler, request, *args, **kwargs):
+        key = f'{CACHE_PREFIX}:response:{signature}'
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, settings.RESPONSE_CACHE_TIMEOUT)
+        return response
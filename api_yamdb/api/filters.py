@@ -1,23 +1,37 @@
 from django_filters import rest_framework as filters
+from rest_framework.filters import BaseFilterBackend
 
+from api.search import search_titles
 from reviews.models import Title
 
 
+class NumberInFilter(filters.BaseInFilter, filters.NumberFilter):
+    """Список чисел через запятую: ?year_in=1994,1999."""
+
+
 class TitleFilter(filters.FilterSet):
     """
     Поиск произведения.
 
-    Возможен поиск по категории,
-    жанру, названию или году.
+    Категория и жанр ищутся по точному slug,
+    поиск по подстроке - через *_contains.
+    Год - точное значение, диапазон или список.
     """
 
     category = filters.CharFilter(
         field_name='category__slug',
+    )
+    category_contains = filters.CharFilter(
+        field_name='category__slug',
         lookup_expr='icontains',
     )
     genre = filters.CharFilter(
         field_name='genre__slug',
+    )
+    genre_contains = filters.CharFilter(
+        field_name='genre__slug',
         lookup_expr='icontains',
+        distinct=True,
     )
     name = filters.CharFilter(
         field_name='name',
@@ -25,9 +39,36 @@ class TitleFilter(filters.FilterSet):
     )
     year = filters.NumberFilter(
         field_name='year',
-        lookup_expr='icontains',
+    )
+    year_min = filters.NumberFilter(
+        field_name='year',
+        lookup_expr='gte',
+    )
+    year_max = filters.NumberFilter(
+        field_name='year',
+        lookup_expr='lte',
+    )
+    year_in = NumberInFilter(
+        field_name='year',
+        lookup_expr='in',
     )
 
     class Meta:
         model = Title
         fields = '__all__'
+
+
+class TitleSearchFilter(BaseFilterBackend):
+    """
+    Полнотекстовый поиск произведений по параметру ?search=.
+
+    Результаты упорядочены по релевантности.
+    """
+
+    search_param = 'search'
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '').strip()
+        if not query:
+            return queryset
+        return search_titles(queryset, query)
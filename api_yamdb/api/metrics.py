@@ -0,0 +1,237 @@
+import bisect
+import glob
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from rest_framework.renderers import JSONRenderer
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+# Как часто процесс сохраняет свои метрики в METRICS_DIR, секунды.
+FLUSH_INTERVAL = 1.0
+
+
+class Histogram:
+    """Гистограмма Prometheus с отдельными рядами по меткам."""
+
+    def __init__(self, name: str, documentation: str, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets)
+        self.series = defaultdict(
+            lambda: [[0] * (len(self.buckets) + 1), 0.0],
+        )
+
+    def observe(self, labels: tuple, value: float) -> None:
+        counts, _ = series = self.series[labels]
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def dump(self) -> list:
+        return [
+            [list(labels), counts, total]
+            for labels, (counts, total) in self.series.items()
+        ]
+
+    def merge(self, dumped: list) -> None:
+        for labels, counts, total in dumped:
+            series = self.series[tuple(labels)]
+            series[0] = [a + b for a, b in zip(series[0], counts)]
+            series[1] += total
+
+    def render(self, label_names):
+        yield f'# HELP {self.name} {self.documentation}'
+        yield f'# TYPE {self.name} histogram'
+        for labels, (counts, total) in sorted(self.series.items()):
+            pairs = [
+                f'{name}="{value}"' for name, value in zip(label_names, labels)
+            ]
+            cumulative = 0
+            bounds = [repr(float(bound)) for bound in self.buckets] + ['+Inf']
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                le = ','.join(pairs + [f'le="{bound}"'])
+                yield f'{self.name}_bucket{{{le}}} {cumulative}'
+            label = ','.join(pairs)
+            yield f'{self.name}_sum{{{label}}} {total}'
+            yield f'{self.name}_count{{{label}}} {cumulative}'
+
+
+class Registry:
+    """
+    Метрики запросов.
+
+    Без METRICS_DIR метрики хранятся в памяти процесса: годится
+    для одного воркера. С METRICS_DIR каждый процесс сохраняет свои
+    метрики в файл <pid>.json, а render() суммирует все файлы,
+    так что /api/v1/metrics/ любого воркера отдаёт общие значения.
+    """
+
+    label_names = ('route', 'method')
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.pid = None
+        self.flushed = 0.0
+        self.histograms = self.create_histograms()
+
+    def after_fork(self):
+        """Воркер начинает с пустыми метриками, а не с копией мастера."""
+        self.lock = threading.Lock()
+        self.reset()
+
+    @staticmethod
+    def create_histograms() -> dict:
+        return {
+            'duration': Histogram(
+                'yamdb_request_duration_seconds',
+                'Время обработки запроса.', LATENCY_BUCKETS,
+            ),
+            'queries': Histogram(
+                'yamdb_request_db_queries',
+                'Число SQL-запросов за запрос.', QUERY_BUCKETS,
+            ),
+            'query_time': Histogram(
+                'yamdb_request_db_duration_seconds',
+                'Время SQL-запросов за запрос.', LATENCY_BUCKETS,
+            ),
+            'render_time': Histogram(
+                'yamdb_request_render_duration_seconds',
+                'Время сериализации ответа в JSON.', LATENCY_BUCKETS,
+            ),
+            'size': Histogram(
+                'yamdb_response_size_bytes',
+                'Размер тела ответа.', SIZE_BUCKETS,
+            ),
+        }
+
+    def record(self, route: str, method: str, sample: 'RequestSample'):
+        labels = (route, method)
+        with self.lock:
+            histograms = self.histograms
+            histograms['duration'].observe(labels, sample.duration)
+            histograms['queries'].observe(labels, sample.queries)
+            histograms['query_time'].observe(labels, sample.query_time)
+            histograms['render_time'].observe(labels, sample.render_time)
+            if sample.size is not None:
+                histograms['size'].observe(labels, sample.size)
+            if (
+                    settings.METRICS_DIR
+                    and time.monotonic() - self.flushed >= FLUSH_INTERVAL
+            ):
+                self.flush()
+
+    def dump(self) -> dict:
+        return {
+            name: histogram.dump()
+            for name, histogram in self.histograms.items()
+        }
+
+    def flush(self) -> None:
+        """Сохраняет метрики процесса в METRICS_DIR, вызывается под lock."""
+        directory = settings.METRICS_DIR
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f'{os.getpid()}.json')
+        if self.pid != os.getpid():
+            # Файл умершего процесса с тем же pid: его значения
+            # продолжаются, чтобы суммы не уменьшались.
+            self.pid = os.getpid()
+            if os.path.exists(path):
+                self.load(self.histograms, path)
+        temporary = f'{path}.tmp'
+        with open(temporary, 'w', encoding='utf-8') as f:
+            json.dump(self.dump(), f)
+        os.replace(temporary, path)
+        self.flushed = time.monotonic()
+
+    @staticmethod
+    def load(histograms: dict, path: str) -> None:
+        try:
+            with open(path, encoding='utf-8') as f:
+                dumped = json.load(f)
+        except (OSError, ValueError):
+            return
+        for name, series in dumped.items():
+            if name in histograms:
+                histograms[name].merge(series)
+
+    def collect(self) -> dict:
+        if not settings.METRICS_DIR:
+            return self.histograms
+        self.flush()
+        histograms = self.create_histograms()
+        pattern = os.path.join(settings.METRICS_DIR, '*.json')
+        for path in glob.glob(pattern):
+            self.load(histograms, path)
+        return histograms
+
+    def render(self) -> str:
+        with self.lock:
+            lines = [
+                line
+                for histogram in self.collect().values()
+                for line in histogram.render(self.label_names)
+            ]
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+os.register_at_fork(after_in_child=REGISTRY.after_fork)
+
+
+class RequestSample:
+    """
+    Замеры одного запроса.
+
+    Наблюдатель SQL-запросов (observed_queries):
+    считает SQL-запросы и их время.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.duration = 0.0
+        self.queries = 0
+        self.query_time = 0.0
+        self.render_time = 0.0
+        self.size = None
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.query_time += time.perf_counter() - started
+
+    def finish(self, response):
+        self.duration = time.perf_counter() - self.started
+        if not response.streaming:
+            self.size = len(response.content)
+
+
+class TimedJSONRenderer(JSONRenderer):
+    """JSONRenderer, который учитывает время рендеринга в замерах запроса."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        request = (renderer_context or {}).get('request')
+        sample = getattr(request, 'metrics_sample', None)
+        if sample is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        started = time.perf_counter()
+        try:
+            return super().render(data, accepted_media_type, renderer_context)
+        finally:
+            sample.render_time += time.perf_counter() - started
@@ -0,0 +1,127 @@
+import asyncio
+import json
+import logging
+import random
+
+from asgiref.sync import markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from api.metrics import REGISTRY, RequestSample
+from api.querycheck import (
+    QueryInspector,
+    RepeatedQueriesError,
+    observed_queries,
+)
+
+logger = logging.getLogger('api.querycheck')
+
+
+class MetricsMiddleware:
+    """
+    Замеры времени, SQL-запросов, рендеринга и размера ответа.
+
+    Измеряется доля запросов METRICS_SAMPLE_RATE, остальные проходят
+    без обёрток. Метрики группируются по имени маршрута, например
+    titles-list или comments-detail.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = settings.METRICS_SAMPLE_RATE
+        if self.sample_rate <= 0:
+            raise MiddlewareNotUsed
+        self.async_mode = asyncio.iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if random.random() >= self.sample_rate:
+            return self.get_response(request)
+        sample = RequestSample()
+        request.metrics_sample = sample
+        with observed_queries(sample):
+            response = self.get_response(request)
+        return self.record(request, sample, response)
+
+    async def __acall__(self, request):
+        if random.random() >= self.sample_rate:
+            return await self.get_response(request)
+        sample = RequestSample()
+        request.metrics_sample = sample
+        with observed_queries(sample):
+            response = await self.get_response(request)
+        return self.record(request, sample, response)
+
+    def record(self, request, sample, response):
+        sample.finish(response)
+        match = request.resolver_match
+        route = match.url_name if match and match.url_name else 'unresolved'
+        REGISTRY.record(route, request.method, sample)
+        return response
+
+
+class QueryInspectorMiddleware:
+    """
+    Поиск N+1 и медленных запросов, включается QUERY_INSPECTOR.
+
+    Отчёт пишется в лог api.querycheck и, если задан
+    QUERY_INSPECTOR_LOG_FILE, строкой JSON в файл.
+    С QUERY_INSPECTOR_RAISE повторы вызывают исключение,
+    чтобы тесты падали на новых N+1.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.QUERY_INSPECTOR:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = asyncio.iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        inspector = QueryInspector(settings.QUERY_INSPECTOR_SLOW_MS)
+        with observed_queries(inspector):
+            response = self.get_response(request)
+        return self.check(request, inspector, response)
+
+    async def __acall__(self, request):
+        inspector = QueryInspector(settings.QUERY_INSPECTOR_SLOW_MS)
+        with observed_queries(inspector):
+            response = await self.get_response(request)
+        return self.check(request, inspector, response)
+
+    def check(self, request, inspector, response):
+        repeated = inspector.repeated(settings.QUERY_INSPECTOR_THRESHOLD)
+        if repeated or inspector.slow:
+            match = request.resolver_match
+            self.report({
+                'route': match.url_name if match else None,
+                'method': request.method,
+                'path': request.get_full_path(),
+                'queries': sum(inspector.counts.values()),
+                'repeated': repeated,
+                'slow': inspector.slow,
+            })
+        if repeated and settings.QUERY_INSPECTOR_RAISE:
+            raise RepeatedQueriesError(json.dumps(repeated, indent=2))
+        return response
+
+    def report(self, data: dict) -> None:
+        line = json.dumps(data, ensure_ascii=False)
+        logger.warning(line)
+        if settings.QUERY_INSPECTOR_LOG_FILE:
+            with open(
+                    settings.QUERY_INSPECTOR_LOG_FILE, 'a', encoding='utf-8',
+            ) as log_file:
+                log_file.write(line + '\n')
@@ -1,3 +1,4 @@
+from django.shortcuts import get_object_or_404
 from rest_framework import mixins, viewsets
 from rest_framework.mixins import (
     CreateModelMixin,
@@ -6,6 +7,8 @@ from rest_framework.mixins import (
 )
 from rest_framework.viewsets import GenericViewSet
 
+from reviews.models import Review, Title
+
 
 class ModelMixinSet(
     CreateModelMixin,
@@ -18,3 +21,40 @@ class ModelMixinSet(
 
 class CreateViewSet(mixins.CreateModelMixin, viewsets.GenericViewSet):
     pass
+
+
+class TitleNestedMixin:
+    """
+    Произведение из адреса вложенного ресурса.
+
+    Загружается один раз за запрос и кэшируется на вьюсете.
+    """
+
+    def get_title(self) -> Title:
+        if not hasattr(self, '_title'):
+            self._title = get_object_or_404(
+                Title, pk=self.kwargs.get('title_id'),
+            )
+        return self._title
+
+
+class ReviewNestedMixin(TitleNestedMixin):
+    """
+    Отзыв и произведение из адреса вложенного ресурса.
+
+    Цепочка title -> review загружается одним запросом. Отзыв
+    к другому произведению даёт 404.
+    """
+
+    def get_review(self) -> Review:
+        if not hasattr(self, '_review'):
+            self._review = get_object_or_404(
+                Review.objects.select_related('title'),
+                pk=self.kwargs.get('review_id'),
+                title_id=self.kwargs.get('title_id'),
+            )
+            self._title = self._review.title
+        return self._review
+
+    def get_title(self) -> Title:
+        return self.get_review().title
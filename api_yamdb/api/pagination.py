@@ -0,0 +1,127 @@
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, LimitOffsetPagination
+
+POSITION_SEPARATOR = '|'
+
+
+class PubDateCursorPagination(CursorPagination):
+    """
+    Курсорная пагинация по дате публикации.
+
+    Позиция курсора - пара (pub_date, id), страница выбирается
+    условием pub_date > p OR (pub_date = p AND id > i) по индексу
+    (..., pub_date, id), без OFFSET на совпадающих датах и COUNT(*).
+    """
+
+    ordering = ('pub_date', 'id')
+    page_size_query_param = 'limit'
+    max_page_size = 100
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """
+        CursorPagination.paginate_queryset с фильтром по паре полей.
+
+        DRF ищет только по первому полю ordering, а совпадения
+        пропускает смещением.
+        """
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+        self.base_url = request.build_absolute_uri()
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            offset, reverse, current_position = 0, False, None
+        else:
+            offset, reverse, current_position = self.cursor
+        if reverse:
+            queryset = queryset.order_by('-pub_date', '-id')
+        else:
+            queryset = queryset.order_by(*self.ordering)
+        if current_position is not None:
+            queryset = queryset.filter(
+                self.seek(current_position, 'lt' if reverse else 'gt'),
+            )
+
+        results = list(queryset[offset:offset + self.page_size + 1])
+        self.page = results[:self.page_size]
+        following_position = None
+        if len(results) > len(self.page):
+            following_position = self._get_position_from_instance(
+                results[-1], self.ordering,
+            )
+        has_following = following_position is not None
+        started = current_position is not None or offset > 0
+        if reverse:
+            self.page.reverse()
+            self.has_next = started
+            self.has_previous = has_following
+            self.next_position = current_position
+            self.previous_position = following_position
+        else:
+            self.has_next = has_following
+            self.has_previous = started
+            self.next_position = following_position
+            self.previous_position = current_position
+        if (
+                (self.has_previous or self.has_next)
+                and self.template is not None
+        ):
+            self.display_page_controls = True
+        return self.page
+
+    def seek(self, position: str, lookup: str) -> Q:
+        pub_date, _, pk = position.partition(POSITION_SEPARATOR)
+        pub_date = parse_datetime(pub_date)
+        if pub_date is None or not pk.isdigit():
+            raise NotFound(self.invalid_cursor_message)
+        return Q(**{f'pub_date__{lookup}': pub_date}) | Q(
+            pub_date=pub_date, **{f'id__{lookup}': int(pk)},
+        )
+
+    def _get_position_from_instance(self, instance, ordering):
+        return (
+            f'{instance.pub_date.isoformat()}{POSITION_SEPARATOR}{instance.pk}'
+        )
+
+
+class OptionalCursorPagination(LimitOffsetPagination):
+    """
+    Пагинация limit/offset с курсорным режимом по запросу.
+
+    Курсорный режим включается параметром ?pagination=cursor,
+    ссылки next/previous в нём содержат параметр cursor.
+    """
+
+    mode_query_param = 'pagination'
+    cursor_mode = 'cursor'
+    cursor_pagination_class = PubDateCursorPagination
+
+    def __init__(self):
+        self.cursor_paginator = None
+
+    def use_cursor(self, request) -> bool:
+        query_params = request.query_params
+        return (
+            query_params.get(self.mode_query_param) == self.cursor_mode
+            or self.cursor_pagination_class.cursor_query_param in query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.use_cursor(request):
+            self.cursor_paginator = self.cursor_pagination_class()
+            return self.cursor_paginator.paginate_queryset(
+                queryset, request, view,
+            )
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_html_context(self):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_html_context()
+        return super().get_html_context()
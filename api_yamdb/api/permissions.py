@@ -30,9 +30,10 @@ class AdminModeratorAuthorPermission(permissions.BasePermission):
         )
 
     def has_object_permission(self, request, view, obj):
+        """Автор сравнивается по id, без загрузки связанного объекта."""
         return (
             request.method in permissions.SAFE_METHODS
-            or obj.author == request.user
+            or obj.author_id == request.user.pk
             or request.user.is_moderator
             or request.user.is_admin
         )
@@ -0,0 +1,148 @@
+import functools
+import json
+import os
+import re
+import sys
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from rest_framework.fields import Field
+from rest_framework.views import APIView
+
+THIS_FILE = os.path.abspath(__file__)
+
+STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+IN_LIST = re.compile(r'IN \((?:\s*(?:\?|%s)\s*,?)+\)')
+PLACEHOLDER = re.compile(r'%s')
+SPACES = re.compile(r'\s+')
+
+
+# Наблюдатели SQL-запросов текущего HTTP-запроса.
+_observers = ContextVar('query_observers', default=())
+
+
+class RepeatedQueriesError(AssertionError):
+    """Один и тот же запрос повторился больше допустимого числа раз."""
+
+
+def fingerprint(sql: str) -> str:
+    """SQL без значений: запросы, различающиеся только параметрами, равны."""
+    sql = STRING_LITERAL.sub('?', sql)
+    sql = NUMBER_LITERAL.sub('?', sql)
+    sql = PLACEHOLDER.sub('?', sql)
+    sql = IN_LIST.sub('IN (...)', sql)
+    return SPACES.sub(' ', sql).strip()
+
+
+def query_origin() -> dict:
+    """
+    Источник запроса по стеку вызовов.
+
+    field - поле сериализатора, при выводе которого выполнен запрос,
+    view - метод вьюхи, code - ближайшая строка кода проекта.
+    """
+    origin = {}
+    frame = sys._getframe(2)
+    while frame is not None and len(origin) < 3:
+        code = frame.f_code
+        owner = frame.f_locals.get('self')
+        if 'field' not in origin and isinstance(owner, Field) and (
+                code.co_name in ('to_representation', 'get_attribute')
+        ):
+            parent = type(owner.parent).__name__
+            origin['field'] = f'{parent}.{owner.field_name}'
+        elif 'view' not in origin and isinstance(owner, APIView):
+            origin['view'] = f'{type(owner).__name__}.{code.co_name}'
+        if 'code' not in origin and is_project_file(code.co_filename):
+            origin['code'] = f'{code.co_filename}:{frame.f_lineno}'
+        frame = frame.f_back
+    return origin
+
+
+def is_project_file(filename: str) -> bool:
+    filename = os.path.abspath(filename)
+    return (
+        filename.startswith(settings.BASE_DIR)
+        and filename != THIS_FILE
+        and 'site-packages' not in filename
+    )
+
+
+def observe_queries(execute, sql, params, many, context):
+    """
+    execute_wrapper каждого соединения с базой.
+
+    Передаёт запрос наблюдателям из observed_queries. Под ASGI вьюха
+    выполняется в другом потоке со своим соединением, но sync_to_async
+    копирует в него контекст, и запросы видны middleware.
+    """
+    for observer in reversed(_observers.get()):
+        execute = functools.partial(observer, execute)
+    return execute(sql, params, many, context)
+
+
+def install_query_observers(connection) -> None:
+    # В начало списка: connection.execute_wrapper() снимает последний.
+    if observe_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, observe_queries)
+
+
+@contextmanager
+def observed_queries(observer):
+    """Наблюдатель получает запросы во всех потоках этого контекста."""
+    token = _observers.set(_observers.get() + (observer,))
+    try:
+        yield observer
+    finally:
+        _observers.reset(token)
+
+
+class QueryInspector:
+    """
+    Сбор отпечатков SQL-запросов одного HTTP-запроса.
+
+    Наблюдатель SQL-запросов, см. observed_queries.
+    """
+
+    def __init__(self, slow_ms: float):
+        self.slow_ms = slow_ms
+        self.counts = Counter()
+        self.durations = defaultdict(float)
+        self.origins = defaultdict(Counter)
+        self.slow = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = (time.perf_counter() - started) * 1000
+            key = fingerprint(sql)
+            origin = query_origin()
+            self.counts[key] += 1
+            self.durations[key] += elapsed
+            self.origins[key][json.dumps(origin, sort_keys=True)] += 1
+            if elapsed >= self.slow_ms:
+                self.slow.append({
+                    'sql': key, 'ms': round(elapsed, 2), **origin,
+                })
+
+    def repeated(self, threshold: int):
+        """Отпечатки, выполненные больше threshold раз."""
+        return [
+            {
+                'sql': key,
+                'count': count,
+                'ms': round(self.durations[key], 2),
+                'origins': [
+                    {**json.loads(origin), 'count': seen}
+                    for origin, seen in self.origins[key].most_common(3)
+                ],
+            }
+            for key, count in self.counts.most_common()
+            if count > threshold
+        ]
@@ -0,0 +1,78 @@
+import re
+
+from django.db import connection
+from django.db.models import BooleanField, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+# Выражение должно совпадать с индексом reviews_title_search_idx
+# из миграции reviews.0004, иначе PostgreSQL не сможет его использовать.
+TITLE_DOCUMENT = (
+    "coalesce({table}name, '') || ' ' || coalesce({table}description, '')"
+)
+POSTGRES_VECTOR = "to_tsvector('simple', {document})".format(
+    document=TITLE_DOCUMENT.format(table='"reviews_title".'),
+)
+POSTGRES_QUERY = "websearch_to_tsquery('simple', %s)"
+SQLITE_FTS_TABLE = 'reviews_title_fts'
+
+
+def fts5_query(query: str) -> str:
+    """Каждое слово запроса ищется как префикс: "слово"*."""
+    return ' '.join(f'"{word}"*' for word in re.findall(r'\w+', query))
+
+
+def search_titles(queryset, query: str):
+    """
+    Полнотекстовый поиск произведений по названию и описанию.
+
+    PostgreSQL использует GIN-индекс по tsvector, SQLite - таблицу FTS5.
+    Результаты упорядочены по релевантности (поле search_rank).
+    """
+    if connection.vendor == 'postgresql':
+        return _search_postgresql(queryset, query)
+    if connection.vendor == 'sqlite' and _sqlite_fts_available():
+        return _search_sqlite(queryset, query)
+    return queryset.filter(
+        Q(name__icontains=query) | Q(description__icontains=query),
+    ).annotate(search_rank=Value(1.0, output_field=FloatField()))
+
+
+def _search_postgresql(queryset, query):
+    return queryset.filter(
+        RawSQL(
+            f'{POSTGRES_VECTOR} @@ {POSTGRES_QUERY}',
+            (query,),
+            output_field=BooleanField(),
+        ),
+    ).annotate(
+        search_rank=RawSQL(
+            f'ts_rank({POSTGRES_VECTOR}, {POSTGRES_QUERY})',
+            (query,),
+            output_field=FloatField(),
+        ),
+    ).order_by('-search_rank', 'pk')
+
+
+def _search_sqlite(queryset, query):
+    match = fts5_query(query)
+    if not match:
+        return queryset.none()
+    return queryset.filter(
+        pk__in=RawSQL(
+            f'SELECT rowid FROM {SQLITE_FTS_TABLE} '
+            f'WHERE {SQLITE_FTS_TABLE} MATCH %s',
+            (match,),
+        ),
+    ).annotate(
+        search_rank=RawSQL(
+            f'SELECT -bm25({SQLITE_FTS_TABLE}) FROM {SQLITE_FTS_TABLE} '
+            f'WHERE {SQLITE_FTS_TABLE} MATCH %s '
+            f'AND rowid = "reviews_title"."id"',
+            (match,),
+            output_field=FloatField(),
+        ),
+    ).order_by('-search_rank', 'pk')
+
+
+def _sqlite_fts_available() -> bool:
+    return SQLITE_FTS_TABLE in connection.introspection.table_names()
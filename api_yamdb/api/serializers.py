@@ -1,5 +1,4 @@
 from django.core.exceptions import ValidationError
-from django.shortcuts import get_object_or_404
 from rest_framework import serializers
 
 from reviews.models import Category, Comment, Genre, Review, Title
@@ -59,7 +58,9 @@ class TitleReadSerializer(serializers.ModelSerializer):
     rating = serializers.IntegerField(read_only=True)
 
     class Meta:
-        fields = '__all__'
+        fields = (
+            'id', 'name', 'year', 'rating', 'description', 'genre', 'category',
+        )
         model = Title
 
 
@@ -77,13 +78,35 @@ class TitleWriteSerializer(serializers.ModelSerializer):
     )
 
     class Meta:
-        fields = '__all__'
+        fields = ('id', 'name', 'year', 'description', 'genre', 'category')
         model = Title
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CompactParentMixin:
+    """
+    С параметром ?compact=1 родитель выводится как id.
+
+    Название произведения или текст отзыва повторяются в каждой
+    записи списка, в компактном ответе вместо них только id.
+    """
+
+    parent_field = None
+
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get('request')
+        compact = request and request.query_params.get('compact')
+        if compact in serializers.BooleanField.TRUE_VALUES:
+            fields[self.parent_field] = serializers.PrimaryKeyRelatedField(
+                read_only=True,
+            )
+        return fields
+
+
+class CommentSerializer(CompactParentMixin, serializers.ModelSerializer):
     """Сериализация модели Комментариев."""
 
+    parent_field = 'review'
     review = serializers.SlugRelatedField(
         slug_field='text',
         read_only=True,
@@ -98,7 +121,8 @@ class CommentSerializer(serializers.ModelSerializer):
         model = Comment
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(CompactParentMixin, serializers.ModelSerializer):
+    parent_field = 'title'
     title = serializers.SlugRelatedField(
         slug_field='name',
         read_only=True,
@@ -117,18 +141,6 @@ class ReviewSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError('Оценка от 1 до 10 ')
         return score
 
-    def validate(self, data):
-        request = self.context['request']
-        author = request.user
-        title_id = self.context.get('view').kwargs.get('title_id')
-        title = get_object_or_404(Title, pk=title_id)
-        if (
-                request.method == 'POST'
-                and Review.objects.filter(title=title, author=author).exists()
-        ):
-            raise ValidationError('Нельзя оставлять несколько отзывов')
-        return data
-
 
 class SignupSerializer(serializers.Serializer):
     username = serializers.CharField(
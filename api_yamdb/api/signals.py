@@ -0,0 +1,133 @@
+from django.core.signals import request_started
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_save,
+)
+from django.dispatch import receiver
+
+from api.authentication import forget_token_version, revoke_user_tokens
+from api.cache import (
+    AUTHORS,
+    CATEGORIES,
+    GENRES,
+    TITLES,
+    comments_scope,
+    invalidate,
+    reviews_scope,
+)
+from api.querycheck import install_query_observers
+from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.ratings import ratings_changed
+from users.models import User
+
+# Поля пользователя, которые попадают в токен или влияют на доступ.
+TOKEN_FIELDS = ('username', 'role', 'is_staff', 'is_superuser', 'is_active')
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_categories(sender, **kwargs):
+    """Категории выводятся и в списке произведений."""
+    invalidate(CATEGORIES, TITLES)
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+def invalidate_genres(sender, **kwargs):
+    """Жанры выводятся и в списке произведений."""
+    invalidate(GENRES, TITLES)
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_delete, sender=Title)
+@receiver(m2m_changed, sender=Title.genre.through)
+@receiver(ratings_changed, sender=Title)
+def invalidate_titles(sender, **kwargs):
+    invalidate(TITLES)
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_delete, sender=Title)
+def invalidate_title_reviews(sender, instance, **kwargs):
+    """
+    Название произведения выводится в его отзывах.
+
+    После удаления произведения без отзывов старый ETag
+    иначе получал бы 304 вместо 404.
+    """
+    invalidate(reviews_scope(instance.pk))
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def invalidate_reviews(sender, instance, **kwargs):
+    """Текст отзыва выводится и в его комментариях."""
+    invalidate(reviews_scope(instance.title_id), comments_scope(instance.pk))
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comments(sender, instance, **kwargs):
+    invalidate(comments_scope(instance.review_id))
+
+
+@receiver(pre_save, sender=User)
+def revoke_changed_user_tokens(sender, instance, raw, update_fields, **kwargs):
+    """
+    Токены с устаревшей ролью перестают приниматься.
+
+    Смена имени пользователя меняет и отзывы с комментариями.
+    """
+    if raw or instance.pk is None:
+        return
+    if update_fields is not None and not set(update_fields) & set(
+            TOKEN_FIELDS,
+    ):
+        return
+    stored = User.objects.filter(pk=instance.pk).values(*TOKEN_FIELDS).first()
+    if stored and any(
+            stored[field] != getattr(instance, field) for field in TOKEN_FIELDS
+    ):
+        # Версия уже увеличена в базе, save() не должен её затереть.
+        instance.token_version = revoke_user_tokens(instance.pk)
+    if stored and stored['username'] != instance.username:
+        invalidate(AUTHORS)
+
+
+@receiver(post_delete, sender=User)
+def revoke_deleted_user_tokens(sender, instance, **kwargs):
+    """Без строки в базе все токены пользователя отклоняются."""
+    forget_token_version(instance.pk)
+
+
+@receiver(request_started)
+def check_persistent_connections(sender, **kwargs):
+    """
+    Закрытие разорванных постоянных соединений перед запросом.
+
+    Django 3.2 не проверяет соединение, сохранённое с CONN_MAX_AGE,
+    и первый запрос после рестарта базы падал бы с ошибкой.
+    Настройка CONN_HEALTH_CHECKS совпадает по имени с Django 4.1+.
+    Бэкенды api_yamdb.db проверяют соединение перед первым запросом
+    к базе, остальные - сразу.
+    """
+    for connection in connections.all():
+        if (
+                connection.connection is None
+                or not connection.settings_dict.get('CONN_HEALTH_CHECKS')
+        ):
+            continue
+        if hasattr(connection, 'health_check_done'):
+            connection.health_check_done = False
+        elif not connection.in_atomic_block and not connection.is_usable():
+            connection.close()
+
+
+@receiver(connection_created)
+def observe_connection_queries(sender, connection, **kwargs):
+    """Запросы любого потока доступны метрикам и поиску N+1."""
+    install_query_observers(connection)
@@ -1,8 +1,11 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
+from api.async_views import async_read_patterns
 from api.views import (
+    APIExport,
     APIGetToken,
+    APIMetrics,
     APISignup,
     UsersViewSet,
     GenreViewSet,
@@ -61,5 +64,15 @@ urlpatterns = [
         APIGetToken.as_view(),
         name='token',
     ),
-    path('v1/', include(router.urls)),
+    path(
+        'v1/export/<str:resource>/',
+        APIExport.as_view(),
+        name='export',
+    ),
+    path(
+        'v1/metrics/',
+        APIMetrics.as_view(),
+        name='metrics',
+    ),
+    path('v1/', include(async_read_patterns(router.urls))),
 ]
@@ -1,9 +1,7 @@
 from typing import List
 
-from django.conf import settings
-from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
-from django.db.models import Avg
+from django.db import IntegrityError, transaction
+from django.http import Http404, HttpResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, serializers, viewsets, status
@@ -11,12 +9,31 @@ from rest_framework.decorators import action
 from rest_framework.filters import SearchFilter
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework.views import APIView
 from rest_framework.viewsets import ModelViewSet
-from rest_framework_simplejwt.tokens import RefreshToken
 
-from api.filters import TitleFilter
-from api.mixins import ModelMixinSet
+from api.authentication import RoleAccessToken
+from api.cache import (
+    AUTHORS,
+    CATEGORIES,
+    GENRES,
+    TITLES,
+    CachedResponseMixin,
+    ConditionalResponseMixin,
+    comments_scope,
+    invalidate,
+    reviews_scope,
+)
+from api.filters import TitleFilter, TitleSearchFilter
+from api.metrics import PROMETHEUS_CONTENT_TYPE, REGISTRY
+from api.mixins import (
+    ModelMixinSet,
+    ReviewNestedMixin,
+    TitleNestedMixin,
+)
+from api.pagination import OptionalCursorPagination
+from api.search import search_titles
 from api.permissions import (
     AdminOnly,
     IsAdminUserOrReadOnly,
@@ -34,24 +51,45 @@ from api.serializers import (
     TitleWriteSerializer,
     ReviewSerializer,
 )
-from reviews.models import Title, Genre, Category, Review
-from users.models import User
+from reviews.export import (
+    CONTENT_TYPES,
+    EXPORT_FORMATS,
+    NDJSON,
+    RESOURCES,
+    export,
+)
+from reviews.models import (
+    Category,
+    Genre,
+    Review,
+    Title,
+    is_duplicate_review,
+)
+from reviews.ratings import deferred_rating_updates, update_title_rating
+from users.models import User, generate_confirmation_code
+from users.outbox import enqueue_email
 
+DUPLICATE_REVIEW = 'Нельзя оставлять несколько отзывов'
 
-class TitleViewSet(ModelViewSet):
+
+class TitleViewSet(CachedResponseMixin, ModelViewSet):
     """
     Вьюсет для модели Title.
 
     Права доступа: Админ,
     остальные только на чтение.
+    Ответы на чтение кэшируются до изменения произведений.
     """
 
-    queryset = Title.objects.annotate(
-        rating=Avg('reviews__score'),
-    ).all()
+    queryset = Title.objects.select_related(
+        'category',
+    ).prefetch_related(
+        'genre',
+    )
     permission_classes = (IsAdminUserOrReadOnly,)
-    filter_backends = (DjangoFilterBackend,)
+    filter_backends = (DjangoFilterBackend, TitleSearchFilter)
     filterset_class = TitleFilter
+    cache_scopes = (TITLES,)
 
     def get_serializer_class(self) -> serializers:
         """
@@ -61,12 +99,41 @@ class TitleViewSet(ModelViewSet):
             В завимости от команды возвращает
             класс сериализатора на чтение или на запись.
         """
-        if self.action in ('list', 'retrieve'):
+        if self.action in ('list', 'retrieve', 'search'):
             return TitleReadSerializer
         return TitleWriteSerializer
 
+    @action(detail=False, url_path='search')
+    def search(self, request):
+        """
+        Поиск произведений по запросу ?q=, упорядоченный по релевантности.
 
-class GenreViewSet(ModelMixinSet):
+        Остальные параметры фильтрации применяются как в списке.
+        """
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response(
+                {'q': 'Укажите поисковый запрос'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return self.conditional_response(
+            self.search_results, request, query,
+        )
+
+    def search_results(self, request, query):
+        queryset = search_titles(
+            self.filter_queryset(self.get_queryset()), query,
+        )
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    def perform_destroy(self, instance):
+        with deferred_rating_updates():
+            instance.delete()
+
+
+class GenreViewSet(CachedResponseMixin, ModelMixinSet):
     """Админ может создавать жанры, остальные только просматривать."""
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
@@ -74,9 +141,12 @@ class GenreViewSet(ModelMixinSet):
     filter_backends = (filters.SearchFilter,)
     lookup_field = 'slug'
     search_fields = ('name',)
+    cache_scopes = (GENRES,)
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(
+        ConditionalResponseMixin, ReviewNestedMixin, viewsets.ModelViewSet,
+):
     """
     Вьюсет для модели Comment.
 
@@ -88,20 +158,20 @@ class CommentViewSet(viewsets.ModelViewSet):
     """
     serializer_class = CommentSerializer
     permission_classes = (AdminModeratorAuthorPermission,)
+    pagination_class = OptionalCursorPagination
+
+    def get_cache_scopes(self):
+        return (comments_scope(self.kwargs.get('review_id')), AUTHORS)
 
     def get_queryset(self) -> List[str]:
         """
         Запрашиваем список комментариев к отзыву.
 
         Returns:
-            Если отзыв существует , возврашает список комментариев
-            к данному отзыву.
+            Если отзыв существует и относится к произведению,
+            возврашает список комментариев к данному отзыву.
         """
-        review = get_object_or_404(
-            Review,
-            id=self.kwargs.get('review_id'),
-        )
-        return review.comments.all()
+        return self.get_review().comments.select_related('author')
 
     def perform_create(self, serializer: CommentSerializer) -> None:
         """
@@ -110,17 +180,13 @@ class CommentViewSet(viewsets.ModelViewSet):
         serializer: преобразование POST запроса
         в JSON объект со всей информацией о комментарии.
         """
-        review = get_object_or_404(
-            Review,
-            id=self.kwargs.get('review_id'),
-        )
         serializer.save(
-            author=self.request.user,
-            review=review,
+            author_id=self.request.user.pk,
+            review=self.get_review(),
         )
 
 
-class CategoryViewSet(ModelMixinSet):
+class CategoryViewSet(CachedResponseMixin, ModelMixinSet):
     """
     Получить доступ всех категорий. Права доступа : дотсупно без токена
     """
@@ -130,25 +196,62 @@ class CategoryViewSet(ModelMixinSet):
     filter_backends = (SearchFilter,)
     search_fields = ('name',)
     lookup_field = 'slug'
+    cache_scopes = (CATEGORIES,)
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(
+        ConditionalResponseMixin, TitleNestedMixin, viewsets.ModelViewSet,
+):
+    """
+    Вьюсет для модели Review.
+
+    Повторный отзыв отклоняется ограничением unique_review в базе.
+    С параметром ?upsert=true повторная отправка заменяет текст
+    и оценку существующего отзыва одним запросом.
+    """
     serializer_class = ReviewSerializer
     permission_classes = (AdminModeratorAuthorPermission,)
+    pagination_class = OptionalCursorPagination
+
+    def get_cache_scopes(self):
+        return (reviews_scope(self.kwargs.get('title_id')), AUTHORS)
 
     def get_queryset(self):
-        title = get_object_or_404(
-            Title,
-            id=self.kwargs.get('title_id'),
-        )
-        return title.reviews.all()
+        return self.get_title().reviews.select_related('author')
 
     def perform_create(self, serializer):
-        title = get_object_or_404(
-            Title,
-            id=self.kwargs.get('title_id'),
+        try:
+            with transaction.atomic():
+                self.create_review(serializer)
+        except IntegrityError as error:
+            # Другие нарушения, например внешнего ключа удалённого
+            # автора, не выдаются за повторный отзыв.
+            if not is_duplicate_review(error):
+                raise
+            raise serializers.ValidationError(
+                {api_settings.NON_FIELD_ERRORS_KEY: [DUPLICATE_REVIEW]},
+            )
+
+    def create_review(self, serializer):
+        upsert = self.request.query_params.get('upsert')
+        if upsert not in serializers.BooleanField.TRUE_VALUES:
+            serializer.save(
+                author_id=self.request.user.pk, title=self.get_title(),
+            )
+            return
+        review = Review.objects.upsert(
+            title_id=self.get_title().pk,
+            author_id=self.request.user.pk,
+            **serializer.validated_data,
         )
-        serializer.save(author=self.request.user, title=title)
+        review.title = self.get_title()
+        update_title_rating(review.title_id)
+        # Сырой upsert не отправляет post_save, а текст
+        # отзыва выводится и в его комментариях.
+        invalidate(
+            reviews_scope(review.title_id), comments_scope(review.pk),
+        )
+        serializer.instance = review
 
 
 class UsersViewSet(viewsets.ModelViewSet):
@@ -160,6 +263,11 @@ class UsersViewSet(viewsets.ModelViewSet):
     search_fields = ('username',)
     http_method_names = ['get', 'post', 'patch', 'delete']
 
+    def perform_destroy(self, instance):
+        """Рейтинги произведений с отзывами пользователя - одним запросом."""
+        with deferred_rating_updates():
+            instance.delete()
+
     @action(
         methods=['GET', 'PATCH'],
         detail=False,
@@ -167,17 +275,21 @@ class UsersViewSet(viewsets.ModelViewSet):
         url_path='me',
     )
     def get_current_user_info(self, request):
-        serializer = UsersSerializer(request.user)
+        user = request.user
+        if not isinstance(user, User):
+            # Без запроса к базе аутентифицирован только UserPrincipal.
+            user = get_object_or_404(User, pk=user.pk)
+        serializer = UsersSerializer(user)
         if request.method == 'PATCH':
-            if request.user.is_admin:
+            if user.is_admin:
                 serializer = UsersSerializer(
-                    request.user,
+                    user,
                     data=request.data,
                     partial=True,
                 )
             else:
                 serializer = NotAdminSerializer(
-                    request.user,
+                    user,
                     data=request.data,
                     partial=True,
                 )
@@ -201,8 +313,13 @@ class APIGetToken(APIView):
                 {'username': 'Пользователь не найден'},
                 status=status.HTTP_404_NOT_FOUND,
             )
-        if data.get('confirmation_code') == user.confirmation_code:
-            token = RefreshToken.for_user(user).access_token
+        # Код одноразовый: UPDATE по старому коду меняет его на новый,
+        # из двух одновременных обменов проходит только один.
+        used = User.objects.filter(
+            pk=user.pk, confirmation_code=data.get('confirmation_code'),
+        ).update(confirmation_code=generate_confirmation_code())
+        if used:
+            token = RoleAccessToken.for_user(user)
             return Response(
                 {'token': str(token)},
                 status=status.HTTP_201_CREATED,
@@ -230,16 +347,62 @@ class APISignup(APIView):
             email=email,
             username=username,
         )
-        confirmation_code = default_token_generator.make_token(user)
-        send_mail(
+        if not created:
+            # Повторная регистрация высылает новый код, старый перестаёт
+            # действовать.
+            user.confirmation_code = generate_confirmation_code()
+            user.save(update_fields=('confirmation_code',))
+        enqueue_email(
             'Код подтверждения YaMDb',
             f'Здравствуйте, {user.username}!'
-            f'\nВаш код подтверждения: {confirmation_code}',
-            settings.DEFAULT_FROM_EMAIL,
-            [email],
-            fail_silently=False,
+            f'\nВаш код подтверждения: {user.confirmation_code}',
+            email,
         )
         return Response(
             serializer.data,
             status=status.HTTP_200_OK,
         )
+
+
+class APIExport(APIView):
+    """
+    Потоковая выгрузка произведений, отзывов и комментариев.
+
+    Права доступа: только админ.
+    Формат задаётся параметром ?output=ndjson|csv.
+    """
+
+    permission_classes = (AdminOnly,)
+
+    def get(self, request, resource):
+        if resource not in RESOURCES:
+            raise Http404
+        export_format = request.query_params.get('output', NDJSON)
+        if export_format not in EXPORT_FORMATS:
+            return Response(
+                {'output': f'Допустимые форматы: {", ".join(EXPORT_FORMATS)}'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        response = StreamingHttpResponse(
+            export(resource, export_format),
+            content_type=CONTENT_TYPES[export_format],
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="{resource}.{export_format}"'
+        )
+        return response
+
+
+class APIMetrics(APIView):
+    """
+    Метрики запросов процесса в текстовом формате Prometheus.
+
+    Права доступа: только админ.
+    """
+
+    permission_classes = (AdminOnly,)
+
+    def get(self, request):
+        return HttpResponse(
+            REGISTRY.render(), content_type=PROMETHEUS_CONTENT_TYPE,
+        )
@@ -0,0 +1,29 @@
+"""
+PostgreSQL с ленивой проверкой постоянного соединения.
+
+Как CONN_HEALTH_CHECKS в Django 4.1: сохранённое соединение
+проверяется один раз за HTTP-запрос, перед первым запросом к базе.
+Ответы из кэша, которым база не нужна, обходятся без SELECT 1.
+"""
+from django.db.backends.postgresql import base
+
+
+class HealthCheckMixin:
+    # Сбрасывается обработчиком request_started в api.signals.
+    health_check_done = True
+
+    def ensure_connection(self):
+        if not self.health_check_done:
+            self.health_check_done = True
+            if (
+                    self.connection is not None
+                    and self.settings_dict.get('CONN_HEALTH_CHECKS')
+                    and not self.in_atomic_block
+                    and not self.is_usable()
+            ):
+                self.close()
+        super().ensure_connection()
+
+
+class DatabaseWrapper(HealthCheckMixin, base.DatabaseWrapper):
+    pass
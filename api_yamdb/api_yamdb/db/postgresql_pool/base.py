@@ -0,0 +1,109 @@
+"""
+PostgreSQL с пулом соединений внутри процесса.
+
+Подходит для потоковых воркеров: соединение берётся из пула при первом
+запросе к базе и возвращается в пул при закрытии, вместо нового
+подключения к серверу. Размер пула задаётся ключом POOL настроек базы.
+
+Когда заняты все MAX_SIZE соединений, поток ждёт свободное
+до POOL['TIMEOUT'] секунд, затем получает ошибку базы PoolError.
+MAX_SIZE не меньше числа потоков воркера исключает ожидание.
+"""
+import os
+import threading
+
+import psycopg2.extras
+from psycopg2 import pool
+
+from api_yamdb.db.postgresql import base
+
+DEFAULT_POOL = {'MIN_SIZE': 1, 'MAX_SIZE': 10, 'TIMEOUT': 5}
+
+
+class BoundedPool:
+    """Пул, который ждёт свободное соединение, а не падает сразу."""
+
+    def __init__(self, minconn, maxconn, timeout, **params):
+        self.pool = pool.ThreadedConnectionPool(minconn, maxconn, **params)
+        self.slots = threading.BoundedSemaphore(maxconn)
+        self.timeout = timeout
+
+    def getconn(self):
+        if not self.slots.acquire(timeout=self.timeout):
+            raise pool.PoolError(
+                f'Нет свободного соединения за {self.timeout} с',
+            )
+        try:
+            return self.pool.getconn()
+        except BaseException:
+            self.slots.release()
+            raise
+
+    def putconn(self, connection, close=False):
+        try:
+            self.pool.putconn(connection, close=close)
+        finally:
+            self.slots.release()
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    # Пулы процесса по псевдониму базы. Ключ включает pid, чтобы
+    # воркеры после fork не делили сокеты родителя.
+    _pools = {}
+    _pools_lock = threading.Lock()
+
+    def get_pool(self, conn_params) -> BoundedPool:
+        key = (os.getpid(), self.alias)
+        with self._pools_lock:
+            if key not in self._pools:
+                size = {**DEFAULT_POOL, **self.settings_dict.get('POOL', {})}
+                self._pools[key] = BoundedPool(
+                    size['MIN_SIZE'], size['MAX_SIZE'], size['TIMEOUT'],
+                    **conn_params,
+                )
+            return self._pools[key]
+
+    def get_new_connection(self, conn_params):
+        connections = self.get_pool(conn_params)
+        connection = connections.getconn()
+        if self.settings_dict.get('CONN_HEALTH_CHECKS') and not usable(
+                connection,
+        ):
+            connections.putconn(connection, close=True)
+            connection = connections.getconn()
+        options = self.settings_dict['OPTIONS']
+        self.isolation_level = options.get(
+            'isolation_level', connection.isolation_level,
+        )
+        if self.isolation_level != connection.isolation_level:
+            connection.set_session(isolation_level=self.isolation_level)
+        psycopg2.extras.register_default_jsonb(
+            conn_or_curs=connection, loads=lambda x: x,
+        )
+        return connection
+
+    def _close(self):
+        if self.connection is None:
+            return
+        connections = self._pools.get((os.getpid(), self.alias))
+        with self.wrap_database_errors:
+            if connections is None:
+                return self.connection.close()
+            # Незавершённую транзакцию пул откатывает сам.
+            connections.putconn(
+                self.connection, close=bool(self.errors_occurred),
+            )
+
+
+def usable(connection) -> bool:
+    """Проверка соединения из пула: сервер мог закрыть его."""
+    if connection.closed:
+        return False
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        if not connection.autocommit:
+            connection.rollback()
+    except psycopg2.Error:
+        return False
+    return True
@@ -1,6 +1,13 @@
 import os
 from datetime import timedelta
 
+from django.core.exceptions import ImproperlyConfigured
+
+
+def env_bool(name: str, default: bool = False) -> bool:
+    return os.getenv(name, default=str(default)).lower() in ('1', 'true', 'yes')
+
+
 SECRET_KEY = os.getenv(
     "SECRET_KEY",
     default="123",
@@ -36,6 +43,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.MetricsMiddleware',
+    'api.middleware.QueryInspectorMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -75,10 +84,39 @@ DATABASES = {
         'USER': os.getenv('POSTGRES_USER'),
         'PASSWORD': os.getenv('POSTGRES_PASSWORD'),
         'HOST': os.getenv('DB_HOST'),
-        'PORT': os.getenv('DB_PORT')
+        'PORT': os.getenv('DB_PORT'),
+        # Соединение переиспользуется между запросами этого потока.
+        # С пулом (DB_ENGINE=api_yamdb.db.postgresql_pool) ставьте 0:
+        # соединение вернётся в пул в конце запроса.
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', default=60)),
+        # Проверка соединения перед запросом, см. api.signals.
+        # С DB_ENGINE=api_yamdb.db.postgresql - перед первым SQL.
+        'CONN_HEALTH_CHECKS': env_bool('DB_CONN_HEALTH_CHECKS', default=True),
+        'POOL': {
+            'MIN_SIZE': int(os.getenv('DB_POOL_MIN_SIZE', default=1)),
+            'MAX_SIZE': int(os.getenv('DB_POOL_MAX_SIZE', default=10)),
+            'TIMEOUT': float(os.getenv('DB_POOL_TIMEOUT', default=5)),
+        },
+    }
+}
+
+LOCAL_CACHE_BACKEND = 'django.core.cache.backends.locmem.LocMemCache'
+
+# В docker-compose задан memcached, память процесса - для тестов
+# и разработки.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', default=LOCAL_CACHE_BACKEND),
+        'LOCATION': os.getenv('CACHE_LOCATION', default=''),
     }
 }
 
+# Версии кэша ответов (и отзыв токенов) в памяти процесса не видны
+# другим воркерам: gunicorn с несколькими воркерами не запустится.
+SHARED_CACHE = CACHES['default']['BACKEND'] != LOCAL_CACHE_BACKEND
+
+RESPONSE_CACHE_TIMEOUT = int(os.getenv('RESPONSE_CACHE_TIMEOUT', default=300))
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -106,13 +144,44 @@ USE_L10N = True
 
 USE_TZ = True
 
+# Чтение каталога и отзывов через асинхронные вьюхи.
+# Включается в api_yamdb/asgi.py, под WSGI только замедляет запросы.
+ASYNC_VIEWS = env_bool('ASYNC_VIEWS')
+
+# Доля запросов, для которых собираются метрики (/api/v1/metrics/).
+METRICS_SAMPLE_RATE = float(os.getenv('METRICS_SAMPLE_RATE', default=0.05))
+# Общий каталог, через который воркеры gunicorn суммируют метрики.
+METRICS_DIR = os.getenv('METRICS_DIR', default='')
+
+# Поиск N+1: отчёт о запросах, повторённых больше THRESHOLD раз
+# за HTTP-запрос, и о запросах дольше SLOW_MS. Для отладки и staging.
+QUERY_INSPECTOR = env_bool('QUERY_INSPECTOR')
+QUERY_INSPECTOR_THRESHOLD = int(os.getenv('QUERY_INSPECTOR_THRESHOLD', default=5))
+QUERY_INSPECTOR_SLOW_MS = float(os.getenv('QUERY_INSPECTOR_SLOW_MS', default=100))
+QUERY_INSPECTOR_LOG_FILE = os.getenv('QUERY_INSPECTOR_LOG_FILE')
+QUERY_INSPECTOR_RAISE = env_bool('QUERY_INSPECTOR_RAISE')
+
+# Роль и id пользователя берутся из токена без запроса к базе.
+JWT_STATELESS_AUTH = env_bool('JWT_STATELESS_AUTH')
+if JWT_STATELESS_AUTH and not SHARED_CACHE:
+    # Отзыв токена в памяти одного процесса не увидят другие воркеры.
+    raise ImproperlyConfigured(
+        'JWT_STATELESS_AUTH требует общего кэша: задайте CACHE_BACKEND',
+    )
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.StatelessJWTAuthentication'
+        if JWT_STATELESS_AUTH
+        else 'rest_framework_simplejwt.authentication.JWTAuthentication',
     ),
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend',
     ],
+    'DEFAULT_RENDERER_CLASSES': (
+        'api.metrics.TimedJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
     'DEFAULT_PAGINATION_CLASS':
         'rest_framework.pagination.LimitOffsetPagination',
     'PAGE_SIZE': 10,
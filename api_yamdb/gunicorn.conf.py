@@ -0,0 +1,115 @@
+"""
+Настройки gunicorn для API.
+
+Запуск: gunicorn api_yamdb.wsgi:application -c gunicorn.conf.py
+Все параметры переопределяются переменными окружения GUNICORN_*.
+"""
+import glob
+import multiprocessing
+import os
+import time
+
+
+def env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, default=default))
+
+
+def env_bool(name: str, default: bool = False) -> bool:
+    value = os.getenv(name, default=str(default))
+    return value.lower() in ('1', 'true', 'yes')
+
+
+bind = os.getenv('GUNICORN_BIND', default='0.0.0.0:8000')
+
+# Запросы в основном ждут базу, поэтому процессов больше, чем ядер,
+# а потоки в каждом процессе делят одно соединение на поток.
+workers = env_int('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1)
+threads = env_int('GUNICORN_THREADS', 2)
+worker_class = os.getenv(
+    'GUNICORN_WORKER_CLASS',
+    default='gthread' if threads > 1 else 'sync',
+)
+
+# Keep-alive за nginx работает только у gthread и асинхронных воркеров.
+keepalive = env_int('GUNICORN_KEEPALIVE', 5)
+timeout = env_int('GUNICORN_TIMEOUT', 30)
+graceful_timeout = env_int('GUNICORN_GRACEFUL_TIMEOUT', 30)
+
+# Перезапуск воркера после N запросов ограничивает рост памяти,
+# разброс не даёт всем воркерам перезапуститься одновременно.
+max_requests = env_int('GUNICORN_MAX_REQUESTS', 1000)
+max_requests_jitter = env_int('GUNICORN_MAX_REQUESTS_JITTER', 100)
+
+# Django загружается в мастере, воркеры делят память через copy-on-write.
+preload_app = env_bool('GUNICORN_PRELOAD', default=True)
+
+accesslog = os.getenv('GUNICORN_ACCESSLOG', default='-')
+loglevel = os.getenv('GUNICORN_LOGLEVEL', default='info')
+
+# Запросы дольше порога записываются в лог с номером воркера.
+SLOW_REQUEST_MS = env_int('GUNICORN_SLOW_REQUEST_MS', 500)
+
+
+def on_starting(server):
+    """Воркеры с кэшем в памяти процесса отдавали бы устаревшие ответы."""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+    from django.conf import settings
+
+    if server.cfg.workers > 1 and not settings.SHARED_CACHE:
+        raise RuntimeError(
+            f'{server.cfg.workers} воркеров не могут работать с кэшем '
+            'в памяти процесса: задайте CACHE_BACKEND и CACHE_LOCATION '
+            '(memcached или FileBasedCache) или GUNICORN_WORKERS=1',
+        )
+    if settings.METRICS_DIR:
+        # Метрики прошлого запуска не суммируются с новыми.
+        for path in glob.glob(os.path.join(settings.METRICS_DIR, '*.json')):
+            os.remove(path)
+    elif server.cfg.workers > 1 and settings.METRICS_SAMPLE_RATE > 0:
+        server.log.warning(
+            'Без METRICS_DIR /api/v1/metrics/ отдаёт метрики только '
+            'ответившего воркера',
+        )
+
+
+def when_ready(server):
+    """Соединения с базой, открытые при preload, не должны попасть в fork."""
+    from django.db import connections
+
+    connections.close_all()
+
+
+def post_fork(server, worker):
+    worker.requests_served = 0
+    worker.request_time = 0.0
+
+
+def pre_request(worker, req):
+    req.started = time.monotonic()
+
+
+def post_request(worker, req, environ, resp):
+    elapsed = time.monotonic() - getattr(req, 'started', time.monotonic())
+    worker.requests_served = getattr(worker, 'requests_served', 0) + 1
+    worker.request_time = getattr(worker, 'request_time', 0.0) + elapsed
+    if elapsed * 1000 >= SLOW_REQUEST_MS:
+        worker.log.warning(
+            'Медленный запрос: worker=%s %s %s %.1f мс',
+            worker.pid, req.method, req.path, elapsed * 1000,
+        )
+
+
+def worker_exit(server, worker):
+    from django.conf import settings
+
+    if settings.METRICS_DIR:
+        from api.metrics import REGISTRY
+
+        with REGISTRY.lock:
+            REGISTRY.flush()
+    served = getattr(worker, 'requests_served', 0)
+    if served:
+        server.log.info(
+            'Воркер %s: запросов %d, среднее время %.1f мс',
+            worker.pid, served, worker.request_time / served * 1000,
+        )
@@ -58,6 +58,7 @@ class TitleAdmin(admin.ModelAdmin):
         'year',
         'category',
         'description',
+        'rating',
     )
     search_fields = ('name',)
     list_filter = ('name',)
@@ -0,0 +1,112 @@
+import csv
+import io
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from reviews.models import Comment, Review, Title
+
+NDJSON = 'ndjson'
+CSV = 'csv'
+EXPORT_FORMATS = (NDJSON, CSV)
+CONTENT_TYPES = {
+    NDJSON: 'application/x-ndjson',
+    CSV: 'text/csv',
+}
+CHUNK_SIZE = 2000
+
+TITLE_COLUMNS = (
+    'id', 'name', 'year', 'description', 'category', 'genres', 'rating',
+    'reviews_count',
+)
+REVIEW_COLUMNS = ('id', 'title_id', 'author', 'text', 'score', 'pub_date')
+COMMENT_COLUMNS = ('id', 'review_id', 'author', 'text', 'pub_date')
+
+
+def iter_titles(chunk_size: int = CHUNK_SIZE):
+    """
+    Произведения с категорией, жанрами и рейтингом.
+
+    Произведения и связи с жанрами читаются двумя курсорами
+    в порядке id произведения и сливаются на лету, поэтому
+    в памяти держится только текущая пачка строк.
+    """
+    titles = Title.objects.order_by('pk').values_list(
+        'id', 'name', 'year', 'description', 'category__slug', 'rating',
+        'reviews_count',
+    ).iterator(chunk_size=chunk_size)
+    links = Title.genre.through.objects.order_by(
+        'title_id', 'genre__slug',
+    ).values_list('title_id', 'genre__slug').iterator(chunk_size=chunk_size)
+    link = next(links, None)
+    for pk, name, year, description, category, rating, count in titles:
+        while link is not None and link[0] < pk:
+            link = next(links, None)
+        genres = []
+        while link is not None and link[0] == pk:
+            genres.append(link[1])
+            link = next(links, None)
+        yield dict(zip(TITLE_COLUMNS, (
+            pk, name, year, description, category, genres, rating, count,
+        )))
+
+
+def iter_reviews(chunk_size: int = CHUNK_SIZE):
+    reviews = Review.objects.order_by('pk').values_list(
+        'id', 'title_id', 'author__username', 'text', 'score', 'pub_date',
+    ).iterator(chunk_size=chunk_size)
+    for row in reviews:
+        yield dict(zip(REVIEW_COLUMNS, row))
+
+
+def iter_comments(chunk_size: int = CHUNK_SIZE):
+    comments = Comment.objects.order_by('pk').values_list(
+        'id', 'review_id', 'author__username', 'text', 'pub_date',
+    ).iterator(chunk_size=chunk_size)
+    for row in comments:
+        yield dict(zip(COMMENT_COLUMNS, row))
+
+
+RESOURCES = {
+    'titles': (iter_titles, TITLE_COLUMNS),
+    'reviews': (iter_reviews, REVIEW_COLUMNS),
+    'comments': (iter_comments, COMMENT_COLUMNS),
+}
+
+
+def render_ndjson(rows):
+    for row in rows:
+        yield json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False) + '\n'
+
+
+def render_csv(rows, columns):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def line(values):
+        writer.writerow(values)
+        value = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return value
+
+    yield line(columns)
+    for row in rows:
+        yield line(
+            ','.join(value) if isinstance(value, list) else value
+            for value in row.values()
+        )
+
+
+def export(resource: str, export_format: str, chunk_size: int = CHUNK_SIZE):
+    """
+    Построчная выгрузка ресурса.
+
+    Returns:
+        Генератор строк в формате NDJSON или CSV.
+    """
+    iter_rows, columns = RESOURCES[resource]
+    rows = iter_rows(chunk_size)
+    if export_format == CSV:
+        return render_csv(rows, columns)
+    return render_ndjson(rows)
@@ -0,0 +1,47 @@
+from django.core.management import BaseCommand
+
+from reviews.export import (
+    CHUNK_SIZE,
+    EXPORT_FORMATS,
+    NDJSON,
+    RESOURCES,
+    export,
+)
+
+
+class Command(BaseCommand):
+    help = 'Потоковая выгрузка произведений, отзывов и комментариев.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'resource',
+            choices=tuple(RESOURCES),
+        )
+        parser.add_argument(
+            '--format',
+            choices=EXPORT_FORMATS,
+            default=NDJSON,
+        )
+        parser.add_argument(
+            '--output',
+            help='Файл для выгрузки. По умолчанию stdout.',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=CHUNK_SIZE,
+            help='Количество строк, читаемых из курсора за раз.',
+        )
+
+    def handle(self, *args, **options):
+        lines = export(
+            options['resource'],
+            options['format'],
+            chunk_size=options['chunk_size'],
+        )
+        if not options['output']:
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+        with open(options['output'], 'w', encoding='utf-8', newline='') as f:
+            f.writelines(lines)
@@ -0,0 +1,331 @@
+import csv
+import io
+import random
+import time
+from array import array
+from datetime import datetime, timedelta
+from itertools import accumulate
+
+from django.core.management import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from reviews.management.commands.load_data import batches
+from reviews.models import Category, Comment, Genre, Review, Title, User
+from reviews.ratings import rebuild_ratings
+
+SCORES = range(1, 11)
+# Высокие оценки ставят чаще низких.
+SCORE_WEIGHTS = tuple(accumulate((2, 1, 2, 3, 5, 8, 12, 15, 12, 8)))
+PERIOD = timedelta(days=5 * 365)
+
+
+def zipf_counts(total: int, size: int, exponent: float, cap: int) -> list:
+    """
+    Распределение total отзывов по size произведениям.
+
+    Доля произведения ранга r пропорциональна 1 / r ** exponent.
+    Ни одно произведение не получает больше cap отзывов: у него
+    не может быть больше отзывов, чем пользователей.
+    """
+    if total > size * cap:
+        raise CommandError(
+            f'{total} отзывов не распределить по {size} произведениям '
+            f'от {cap} пользователей',
+        )
+    weights = [1 / rank ** exponent for rank in range(1, size + 1)]
+    counts = [0] * size
+    active = list(range(size))
+    remaining = total
+    while remaining:
+        share = remaining / sum(weights[i] for i in active)
+        added = 0
+        for i in active:
+            extra = min(cap - counts[i], int(share * weights[i]))
+            counts[i] += extra
+            added += extra
+        active = [i for i in active if counts[i] < cap]
+        if not added:
+            # Остаток меньше доли любого произведения:
+            # по одному самым популярным из незаполненных.
+            added = min(remaining, len(active))
+            for i in active[:added]:
+                counts[i] += 1
+            active = [i for i in active if counts[i] < cap]
+        remaining -= added
+    return counts
+
+
+def next_id(model) -> int:
+    return (model.objects.aggregate(value=Max('pk'))['value'] or 0) + 1
+
+
+def db_datetime(value: float, aware: bool) -> str:
+    """
+    Время UTC в виде, в котором его хранит Django.
+
+    Без поддержки часовых поясов в базе (SQLite) время
+    хранится без смещения.
+    """
+    text = datetime.utcfromtimestamp(value).isoformat(' ')
+    return f'{text}+00:00' if aware else text
+
+
+class Command(BaseCommand):
+    help = (
+        'Генерация синтетических пользователей, произведений, '
+        'отзывов и комментариев пачечными вставками.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--categories', type=int, default=10)
+        parser.add_argument('--genres', type=int, default=30)
+        parser.add_argument('--titles', type=int, default=10000)
+        parser.add_argument(
+            '--reviews',
+            type=int,
+            default=100000,
+            help='Общее количество отзывов.',
+        )
+        parser.add_argument(
+            '--comments',
+            type=int,
+            default=200000,
+            help='Общее количество комментариев.',
+        )
+        parser.add_argument(
+            '--genres-per-title',
+            type=int,
+            default=3,
+            help='Максимальное количество жанров у произведения.',
+        )
+        parser.add_argument(
+            '--zipf',
+            type=float,
+            default=1.1,
+            help='Показатель распределения популярности произведений.',
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=10000,
+            help='Количество строк в одной вставке.',
+        )
+        parser.add_argument(
+            '--no-copy',
+            action='store_true',
+            help='Не использовать COPY на PostgreSQL.',
+        )
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.use_copy = (
+            connection.vendor == 'postgresql' and not options['no_copy']
+        )
+        self.now = timezone.now().timestamp()
+        self.aware = connection.features.supports_timezones
+        self.created = 0
+        started = time.monotonic()
+        with transaction.atomic():
+            users = self.create_users(options['users'])
+            categories = self.generate(
+                Category, ('id', 'name', 'slug'),
+                self.named(Category, options['categories']),
+            )
+            genres = self.generate(
+                Genre, ('id', 'name', 'slug'),
+                self.named(Genre, options['genres']),
+            )
+            titles = self.generate(
+                Title,
+                ('id', 'name', 'year', 'description', 'category_id',
+                 'reviews_count'),
+                self.titles(options['titles'], categories),
+            )
+            self.generate(
+                Title.genre.through, ('id', 'title_id', 'genre_id'),
+                self.title_genres(
+                    titles, genres, options['genres_per_title'],
+                ),
+            )
+            counts = zipf_counts(
+                options['reviews'], len(titles), options['zipf'], len(users),
+            )
+            reviews = self.generate(
+                Review,
+                ('id', 'title_id', 'author_id', 'text', 'score', 'pub_date'),
+                self.reviews(titles, users, counts),
+            )
+            self.generate(
+                Comment,
+                ('id', 'review_id', 'author_id', 'text', 'pub_date'),
+                self.comments(reviews, counts, users, options['comments']),
+            )
+            rebuild_ratings()
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано строк: {self.created} за {elapsed:.1f} с '
+            f'({self.created / elapsed:.0f} строк/с)',
+        ))
+
+    def generate(self, model, columns, rows) -> range:
+        """
+        Пачечная вставка строк с заранее назначенными id.
+
+        Строки - кортежи значений колонок без id, модели
+        не создаются: основное время уходит на саму вставку.
+
+        Returns:
+            Диапазон id созданных строк.
+        """
+        first = next_id(model)
+        pk = first
+        started = time.monotonic()
+        for batch in batches(rows, self.batch_size):
+            batch = [(pk + i, *row) for i, row in enumerate(batch)]
+            self.insert(model, columns, batch)
+            pk += len(batch)
+        self.reset_sequence(model)
+        return self.report(model, first, pk, started)
+
+    def insert(self, model, columns, rows):
+        quote = connection.ops.quote_name
+        table = quote(model._meta.db_table)
+        names = ', '.join(quote(column) for column in columns)
+        with connection.cursor() as cursor:
+            if self.use_copy:
+                buffer = io.StringIO()
+                csv.writer(buffer).writerows(rows)
+                buffer.seek(0)
+                cursor.copy_expert(
+                    f'COPY {table} ({names}) FROM STDIN WITH (FORMAT csv)',
+                    buffer,
+                )
+            else:
+                placeholders = ', '.join(['%s'] * len(columns))
+                cursor.executemany(
+                    f'INSERT INTO {table} ({names}) VALUES ({placeholders})',
+                    rows,
+                )
+
+    def reset_sequence(self, model):
+        """После вставки явных id счётчик первичного ключа сдвигается."""
+        statements = connection.ops.sequence_reset_sql(no_style(), [model])
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+
+    def report(self, model, first, last, started) -> range:
+        created = last - first
+        elapsed = max(time.monotonic() - started, 1e-6)
+        self.created += created
+        self.stdout.write(
+            f'{model._meta.db_table}: {created} '
+            f'({created / elapsed:.0f} строк/с)',
+        )
+        return range(first, last)
+
+    def create_users(self, count) -> range:
+        """
+        Пользователи создаются через bulk_create: менеджер
+        заполняет код подтверждения и остальные поля по умолчанию.
+        """
+        first = next_id(User)
+        started = time.monotonic()
+        # Префикс из первого id не пересекается с прошлыми запусками.
+        prefix = f'user{first}_'
+        User.objects.bulk_create(
+            (
+                User(
+                    id=first + i,
+                    username=f'{prefix}{i}',
+                    email=f'{prefix}{i}@yamdb.test',
+                )
+                for i in range(count)
+            ),
+            batch_size=self.batch_size,
+        )
+        self.reset_sequence(User)
+        return self.report(User, first, first + count, started)
+
+    def random_date(self, after: float = None) -> float:
+        start = after or self.now - PERIOD.total_seconds()
+        return start + self.rng.random() * (self.now - start)
+
+    def named(self, model, count):
+        start = next_id(model)
+        name = model._meta.verbose_name
+        slug = model._meta.model_name
+        for i in range(start, start + count):
+            yield f'{name} {i}', f'{slug}-{i}'
+
+    def titles(self, count, categories):
+        start = next_id(Title)
+        year = timezone.now().year
+        for i in range(start, start + count):
+            yield (
+                f'Произведение {i}',
+                self.rng.randint(1900, year),
+                f'Описание произведения {i}',
+                self.rng.choice(categories),
+                0,
+            )
+
+    def title_genres(self, titles, genres, per_title):
+        per_title = min(per_title, len(genres))
+        for title in titles:
+            count = self.rng.randint(1, per_title)
+            for genre in self.rng.sample(genres, count):
+                yield title, genre
+
+    def reviews(self, titles, users, counts):
+        """
+        Отзывы по распределению Ципфа.
+
+        Ранги популярности перемешаны относительно id произведений,
+        авторы отзывов на одно произведение различны (unique_review).
+        """
+        ranked = list(titles)
+        self.rng.shuffle(ranked)
+        # Комментарии должны быть позже своего отзыва.
+        self.review_dates = array('d')
+        for title, count in zip(ranked, counts):
+            authors = self.rng.sample(users, count)
+            scores = self.rng.choices(
+                SCORES, cum_weights=SCORE_WEIGHTS, k=count,
+            )
+            text = f'Отзыв на произведение {title}'
+            for author, score in zip(authors, scores):
+                date = self.random_date()
+                self.review_dates.append(date)
+                yield (
+                    title, author, text, score,
+                    db_datetime(date, self.aware),
+                )
+
+    def comments(self, reviews, counts, users, total):
+        """Комментарии чаще пишут к отзывам на популярные произведения."""
+        if total and not reviews:
+            raise CommandError('Комментарии не к чему добавить: нет отзывов')
+        weights = list(accumulate(
+            1 / rank
+            for rank, count in enumerate(counts, start=1)
+            for _ in range(count)
+        ))
+        picked = self.rng.choices(
+            range(len(reviews)), cum_weights=weights, k=total,
+        )
+        for index in picked:
+            review = reviews[index]
+            date = self.random_date(after=self.review_dates[index])
+            yield (
+                review,
+                self.rng.choice(users),
+                f'Комментарий к отзыву {review}',
+                db_datetime(date, self.aware),
+            )
@@ -1,31 +1,213 @@
 import csv
+import io
+import os
+from contextlib import contextmanager, nullcontext
+from itertools import islice
 
 from django.conf import settings
-from django.core.management import BaseCommand
+from django.core.exceptions import ValidationError
+from django.core.management import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import DatabaseError, connection, transaction
 
 from reviews.models import Category, Comment, Genre, Review, Title, User
+from reviews.ratings import rebuild_ratings
 
-TABLES = {
-    User: 'users.csv',
-    Category: 'category.csv',
-    Genre: 'genre.csv',
-    Title: 'titles.csv',
-    Review: 'review.csv',
-    Comment: 'comments.csv',
-}
+TABLES = (
+    (User, 'users.csv'),
+    (Category, 'category.csv'),
+    (Genre, 'genre.csv'),
+    (Title, 'titles.csv'),
+    (Title.genre.through, 'genre_title.csv'),
+    (Review, 'review.csv'),
+    (Comment, 'comments.csv'),
+)
+# Пользователям при создании генерируется код подтверждения,
+# поэтому они всегда загружаются через bulk_create.
+COPY_EXCLUDED = (User,)
+
+
+def table_name(filename: str) -> str:
+    return os.path.splitext(filename)[0]
+
+
+def batches(rows, size):
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+
+@contextmanager
+def keep_auto_now_add(fields):
+    """Даты из CSV не подменяются текущим временем."""
+    auto_fields = [
+        field for field in fields if getattr(field, 'auto_now_add', False)
+    ]
+    for field in auto_fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in auto_fields:
+            field.auto_now_add = True
 
 
 class Command(BaseCommand):
+    help = 'Потоковая загрузка данных из CSV.'
 
-    def handle(self, *args, **kwargs):
-        for model, filename in TABLES.items():
-            with open(
-                    f'{settings.BASE_DIR}/static/data/{filename}',
-                    'r',
-                    encoding='utf-8'
-            ) as csv_file:
-                reader = csv.DictReader(csv_file)
-                model.objects.bulk_create(
-                    model(**data) for data in reader
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            default=os.path.join(settings.BASE_DIR, 'static', 'data'),
+            help='Каталог с CSV-файлами.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Количество строк в одной вставке.',
+        )
+        parser.add_argument(
+            '--table',
+            choices=[table_name(filename) for _, filename in TABLES],
+            help='Начать загрузку с этой таблицы, пропустив предыдущие.',
+        )
+        parser.add_argument(
+            '--offset',
+            type=int,
+            default=0,
+            help='Пропустить столько строк первой загружаемой таблицы.',
+        )
+        parser.add_argument(
+            '--commit-every-batch',
+            action='store_true',
+            help=(
+                'Фиксировать каждую пачку отдельно, чтобы после сбоя '
+                'продолжить с места остановки. По умолчанию каждая '
+                'таблица загружается в одной транзакции.'
+            ),
+        )
+        parser.add_argument(
+            '--no-copy',
+            action='store_true',
+            help='Не использовать COPY на PostgreSQL.',
+        )
+
+    def handle(self, *args, **options):
+        self.batch_size = options['batch_size']
+        self.use_copy = (
+            connection.vendor == 'postgresql' and not options['no_copy']
+        )
+        tables = list(TABLES)
+        if options['table']:
+            names = [table_name(filename) for _, filename in TABLES]
+            tables = tables[names.index(options['table']):]
+        offset = options['offset']
+        for model, filename in tables:
+            path = os.path.join(options['path'], filename)
+            if not os.path.exists(path):
+                self.stdout.write(
+                    self.style.WARNING(f'{filename} не найден, пропущен'),
                 )
+                continue
+            self.load_table(
+                model, path, offset, options['commit_every_batch'],
+            )
+            offset = 0
+        rebuild_ratings()
         self.stdout.write(self.style.SUCCESS('Все данные загружены'))
+
+    def load_table(self, model, path, offset, commit_every_batch):
+        name = table_name(os.path.basename(path))
+        loaded = offset
+        table_transaction = (
+            nullcontext() if commit_every_batch else transaction.atomic()
+        )
+        try:
+            with open(path, 'r', encoding='utf-8') as csv_file:
+                reader = csv.DictReader(csv_file)
+                fields = self.resolve_fields(model, reader.fieldnames)
+                rows = islice(reader, offset, None)
+                with table_transaction, keep_auto_now_add(fields):
+                    for batch in batches(rows, self.batch_size):
+                        with transaction.atomic():
+                            self.insert(model, fields, batch)
+                        loaded += len(batch)
+                        self.stdout.write(f'{name}: загружено {loaded}')
+                    self.reset_sequence(model)
+        except (DatabaseError, ValidationError, ValueError) as error:
+            resume_from = loaded if commit_every_batch else offset
+            raise CommandError(
+                f'Ошибка загрузки {name}: {error}. Продолжить можно '
+                f'с --table {name} --offset {resume_from}',
+            )
+
+    def resolve_fields(self, model, headers):
+        """
+        Поля модели для колонок CSV.
+
+        Колонка со связью (author, category) заполняет
+        внешний ключ (author_id, category_id) без запросов к базе.
+        """
+        try:
+            return [model._meta.get_field(header) for header in headers]
+        except Exception as error:
+            raise CommandError(f'{model.__name__}: {error}')
+
+    def build_objects(self, model, fields, batch):
+        objects = []
+        for row in batch:
+            values = {}
+            for field, value in zip(fields, row.values()):
+                if value == '' and field.null:
+                    value = None
+                values[field.attname] = value
+            objects.append(model(**values))
+        return objects
+
+    def insert(self, model, fields, batch):
+        objects = self.build_objects(model, fields, batch)
+        if self.use_copy and model not in COPY_EXCLUDED:
+            self.copy(model, objects)
+        else:
+            model.objects.bulk_create(objects)
+
+    def copy(self, model, objects):
+        """Вставка пачки через COPY ... FROM STDIN."""
+        fields = [
+            field for field in model._meta.concrete_fields
+            if not (field.primary_key and objects[0].pk is None)
+        ]
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, quoting=csv.QUOTE_NONNUMERIC)
+        for obj in objects:
+            writer.writerow(
+                field.get_db_prep_save(
+                    field.pre_save(obj, add=True), connection,
+                )
+                for field in fields
+            )
+        buffer.seek(0)
+        quote = connection.ops.quote_name
+        columns = ', '.join(quote(field.column) for field in fields)
+        # csv пишет None как "", поэтому для nullable-колонок
+        # пустая строка превращается обратно в NULL.
+        nullable = ', '.join(
+            quote(field.column) for field in fields if field.null
+        )
+        force_null = f', FORCE_NULL ({nullable})' if nullable else ''
+        with connection.cursor() as cursor:
+            cursor.copy_expert(
+                f'COPY {quote(model._meta.db_table)} ({columns}) '
+                f'FROM STDIN WITH (FORMAT csv{force_null})',
+                buffer,
+            )
+
+    def reset_sequence(self, model):
+        """После вставки явных id счётчик первичного ключа сдвигается."""
+        statements = connection.ops.sequence_reset_sql(no_style(), [model])
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
@@ -0,0 +1,45 @@
+from django.core.management import BaseCommand, CommandError
+
+from reviews.ratings import find_inconsistent_ratings, rebuild_ratings
+
+
+class Command(BaseCommand):
+    help = 'Пересчёт сохранённых рейтингов произведений.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Только проверить рейтинги, ничего не изменяя.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=10000,
+            help='Количество произведений в одном UPDATE.',
+        )
+
+    def handle(self, *args, **options):
+        if options['check']:
+            return self.check_ratings()
+        updated = rebuild_ratings(batch_size=options['batch_size'])
+        self.stdout.write(
+            self.style.SUCCESS(f'Обновлён рейтинг у произведений: {updated}'),
+        )
+
+    def check_ratings(self):
+        inconsistent = 0
+        for pk, rating, actual_rating, count, actual_count in (
+                find_inconsistent_ratings()
+        ):
+            inconsistent += 1
+            self.stdout.write(
+                f'Произведение {pk}: рейтинг {rating} '
+                f'(ожидается {actual_rating}), отзывов {count} '
+                f'(ожидается {actual_count})',
+            )
+        if inconsistent:
+            raise CommandError(
+                f'Рейтинги расходятся у {inconsistent} произведений',
+            )
+        self.stdout.write(self.style.SUCCESS('Рейтинги согласованы'))
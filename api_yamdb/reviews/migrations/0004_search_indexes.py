@@ -0,0 +1,92 @@
+from django.db import OperationalError, migrations
+
+# Документ для полнотекстового поиска. Выражение совпадает
+# с api.search.TITLE_DOCUMENT, иначе индекс не будет использоваться.
+TITLE_DOCUMENT = "coalesce(name, '') || ' ' || coalesce(description, '')"
+
+# Django выполняет icontains на PostgreSQL как UPPER(col::text) LIKE ...,
+# поэтому триграммные индексы строятся по тому же выражению.
+POSTGRESQL_FORWARD = (
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    'CREATE INDEX IF NOT EXISTS reviews_title_search_idx ON reviews_title '
+    f"USING gin (to_tsvector('simple', {TITLE_DOCUMENT}))",
+    'CREATE INDEX IF NOT EXISTS reviews_title_name_trgm_idx '
+    'ON reviews_title USING gin (UPPER(name::text) gin_trgm_ops)',
+    'CREATE INDEX IF NOT EXISTS reviews_genre_name_trgm_idx '
+    'ON reviews_genre USING gin (UPPER(name::text) gin_trgm_ops)',
+    'CREATE INDEX IF NOT EXISTS reviews_category_name_trgm_idx '
+    'ON reviews_category USING gin (UPPER(name::text) gin_trgm_ops)',
+)
+POSTGRESQL_BACKWARD = (
+    'DROP INDEX IF EXISTS reviews_title_search_idx',
+    'DROP INDEX IF EXISTS reviews_title_name_trgm_idx',
+    'DROP INDEX IF EXISTS reviews_genre_name_trgm_idx',
+    'DROP INDEX IF EXISTS reviews_category_name_trgm_idx',
+)
+
+# На SQLite поиск идёт по внешней таблице FTS5,
+# которую триггеры синхронизируют с reviews_title.
+# SQLite пересоздаёт таблицу при AddField/AlterField, и триггеры
+# теряются: такие миграции Title должны повторно вызвать
+# create_search_indexes. Индексы добавляются через AddIndex.
+SQLITE_FORWARD = (
+    'CREATE VIRTUAL TABLE reviews_title_fts USING fts5('
+    "name, description, content='reviews_title', content_rowid='id')",
+    'CREATE TRIGGER reviews_title_fts_insert AFTER INSERT ON reviews_title '
+    'BEGIN INSERT INTO reviews_title_fts(rowid, name, description) '
+    'VALUES (new.id, new.name, new.description); END',
+    'CREATE TRIGGER reviews_title_fts_delete AFTER DELETE ON reviews_title '
+    'BEGIN INSERT INTO reviews_title_fts'
+    "(reviews_title_fts, rowid, name, description) VALUES ('delete', "
+    'old.id, old.name, old.description); END',
+    'CREATE TRIGGER reviews_title_fts_update '
+    'AFTER UPDATE OF name, description ON reviews_title '
+    'BEGIN INSERT INTO reviews_title_fts'
+    "(reviews_title_fts, rowid, name, description) VALUES ('delete', "
+    'old.id, old.name, old.description); '
+    'INSERT INTO reviews_title_fts(rowid, name, description) '
+    'VALUES (new.id, new.name, new.description); END',
+    "INSERT INTO reviews_title_fts(reviews_title_fts) VALUES ('rebuild')",
+)
+SQLITE_BACKWARD = (
+    'DROP TRIGGER IF EXISTS reviews_title_fts_insert',
+    'DROP TRIGGER IF EXISTS reviews_title_fts_delete',
+    'DROP TRIGGER IF EXISTS reviews_title_fts_update',
+    'DROP TABLE IF EXISTS reviews_title_fts',
+)
+
+
+def execute(schema_editor, statements):
+    for sql in statements:
+        schema_editor.execute(sql)
+
+
+def create_search_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        execute(schema_editor, POSTGRESQL_FORWARD)
+    elif vendor == 'sqlite':
+        try:
+            execute(schema_editor, SQLITE_FORWARD)
+        except OperationalError:
+            # SQLite собран без FTS5: поиск работает через icontains.
+            execute(schema_editor, SQLITE_BACKWARD)
+
+
+def drop_search_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        execute(schema_editor, POSTGRESQL_BACKWARD)
+    elif vendor == 'sqlite':
+        execute(schema_editor, SQLITE_BACKWARD)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0003_pub_date_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -1,5 +1,6 @@
 from django.core.validators import MinValueValidator, MaxValueValidator
-from django.db import models
+from django.db import IntegrityError, connections, models
+from django.utils import timezone
 
 from reviews.validators import validate_year
 from users.models import User
@@ -58,6 +59,9 @@ class Title(models.Model):
         description: Описание произведения.
         genre: Жанр произведения. Установлена связь
             с моделью Genre.
+        rating: Средняя оценка по отзывам. Пересчитывается
+            при каждом изменении отзывов произведения.
+        reviews_count: Количество отзывов на произведение.
     """
     name = models.CharField(
         'название',
@@ -87,16 +91,65 @@ class Title(models.Model):
         related_name='titles',
         verbose_name='жанр',
     )
+    rating = models.FloatField(
+        'рейтинг',
+        null=True,
+        blank=True,
+        editable=False,
+    )
+    reviews_count = models.PositiveIntegerField(
+        'количество отзывов',
+        default=0,
+        editable=False,
+    )
 
     class Meta:
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
+        indexes = [
+            models.Index(fields=('year',), name='title_year_idx'),
+        ]
 
     def __str__(self) -> str:
         """Возвращаем в консоль назв. произведения."""
         return self.name
 
 
+UNIQUE_REVIEW = 'unique_review'
+
+
+class ReviewQuerySet(models.QuerySet):
+    def upsert(self, title_id: int, author_id: int, text: str, score: int):
+        """
+        Создание отзыва или замена текста и оценки существующего.
+
+        Выполняется одним INSERT ... ON CONFLICT по ограничению
+        unique_review. Сигналы post_save не отправляются, рейтинг
+        произведения пересчитывает вызывающий код.
+        """
+        connection = connections[self.db]
+        if connection.vendor not in ('postgresql', 'sqlite'):
+            review, _ = self.update_or_create(
+                title_id=title_id,
+                author_id=author_id,
+                defaults={'text': text, 'score': score},
+            )
+            return review
+        table = connection.ops.quote_name(self.model._meta.db_table)
+        columns = 'title_id, author_id, text, score, pub_date'
+        pub_date = self.model._meta.get_field('pub_date').get_db_prep_value(
+            timezone.now(), connection,
+        )
+        return self.raw(
+            f'INSERT INTO {table} ({columns}) '
+            'VALUES (%s, %s, %s, %s, %s) '
+            'ON CONFLICT (title_id, author_id) DO UPDATE '
+            'SET text = excluded.text, score = excluded.score '
+            f'RETURNING id, {columns}',
+            (title_id, author_id, text, score, pub_date),
+        )[0]
+
+
 class Review(models.Model):
     title = models.ForeignKey(
         Title,
@@ -112,6 +165,7 @@ class Review(models.Model):
         on_delete=models.CASCADE,
         related_name='reviews',
         verbose_name='автор',
+        db_index=False,
     )
     score = models.PositiveSmallIntegerField(
         'оценка',
@@ -127,13 +181,26 @@ class Review(models.Model):
         db_index=True,
     )
 
+    objects = ReviewQuerySet.as_manager()
+
     class Meta:
         verbose_name = 'Отзыв'
         verbose_name_plural = 'Отзывы'
         constraints = [
             models.UniqueConstraint(
                 fields=('title', 'author',),
-                name='unique_review',
+                name=UNIQUE_REVIEW,
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=('title', 'pub_date', 'id'),
+                name='review_title_pub_date_idx',
+            ),
+            # Заменяет индекс внешнего ключа author.
+            models.Index(
+                fields=('author', 'pub_date', 'id'),
+                name='review_author_pub_date_idx',
             ),
         ]
         ordering = ('pub_date',)
@@ -141,6 +208,29 @@ class Review(models.Model):
     def __str__(self):
         return self.text
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Произведение из базы: при переносе отзыва
+        # пересчитываются рейтинги обоих произведений.
+        instance.loaded_title_id = instance.__dict__.get('title_id')
+        return instance
+
+
+def is_duplicate_review(error: IntegrityError) -> bool:
+    """
+    Нарушено ли ограничение unique_review.
+
+    PostgreSQL сообщает имя ограничения, SQLite - только столбцы.
+    """
+    diag = getattr(error.__cause__, 'diag', None)
+    if diag is not None:
+        return diag.constraint_name == UNIQUE_REVIEW
+    table = Review._meta.db_table
+    return str(error) == (
+        f'UNIQUE constraint failed: {table}.title_id, {table}.author_id'
+    )
+
 
 class GenreTitle(models.Model):
     """Произведения - жанры."""
@@ -194,6 +284,7 @@ class Comment(models.Model):
         on_delete=models.CASCADE,
         related_name='comments',
         verbose_name='автор',
+        db_index=False,
     )
     pub_date = models.DateTimeField(
         'дата публикации',
@@ -204,6 +295,17 @@ class Comment(models.Model):
     class Meta:
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = [
+            models.Index(
+                fields=('review', 'pub_date', 'id'),
+                name='comment_review_pub_date_idx',
+            ),
+            # Заменяет индекс внешнего ключа author.
+            models.Index(
+                fields=('author', 'pub_date', 'id'),
+                name='comment_author_pub_date_idx',
+            ),
+        ]
 
     def __str__(self) -> str:
         """Возвращаем в консоль текст комментария."""
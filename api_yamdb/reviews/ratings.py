@@ -0,0 +1,158 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db.models import Avg, Count, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.dispatch import Signal
+
+from reviews.models import Review, Title
+
+RATING_PRECISION = 1e-6
+
+# Отправляется после того, как у произведений изменился рейтинг.
+# Аргумент title_ids - список id изменённых произведений.
+ratings_changed = Signal()
+
+# id произведений, пересчёт которых отложен до выхода
+# из deferred_rating_updates.
+_deferred_title_ids = ContextVar('deferred_title_ids', default=None)
+
+
+def rating_expressions(review_model=Review) -> dict:
+    """
+    Выражения для пересчёта рейтинга и количества отзывов.
+
+    Подзапросы выполняются по отзывам одного произведения
+    и используют индекс по title_id, поэтому UPDATE не требует
+    соединения со всей таблицей отзывов.
+    """
+    reviews = review_model.objects.filter(
+        title=OuterRef('pk'),
+    ).order_by().values('title')
+    return {
+        'rating': Subquery(
+            reviews.annotate(value=Avg('score')).values('value'),
+        ),
+        'reviews_count': Coalesce(
+            Subquery(reviews.annotate(value=Count('pk')).values('value')),
+            0,
+        ),
+    }
+
+
+def _update_ratings(titles) -> int:
+    """
+    Обновляет только те произведения, у которых рейтинг изменился.
+
+    Сравнение как IS DISTINCT FROM: exclude() с NULL-рейтингом
+    считал бы изменёнными все произведения без отзывов.
+    """
+    expressions = rating_expressions()
+    changed = (
+        Q(rating__isnull=True, new_rating__isnull=False)
+        | Q(rating__isnull=False, new_rating__isnull=True)
+        | Q(rating__lt=F('new_rating'))
+        | Q(rating__gt=F('new_rating'))
+        | ~Q(reviews_count=F('new_count'))
+    )
+    return titles.annotate(
+        new_rating=expressions['rating'],
+        new_count=expressions['reviews_count'],
+    ).filter(changed).update(**expressions)
+
+
+def update_title_rating(title_id: int) -> bool:
+    """
+    Пересчёт рейтинга одного произведения одним запросом.
+
+    Внутри deferred_rating_updates пересчёт откладывается.
+
+    Returns:
+        True, если рейтинг или количество отзывов изменились.
+    """
+    deferred = _deferred_title_ids.get()
+    if deferred is not None:
+        deferred.add(title_id)
+        return False
+    changed = _update_ratings(Title.objects.filter(pk=title_id))
+    if changed:
+        ratings_changed.send(sender=Title, title_ids=[title_id])
+    return bool(changed)
+
+
+@contextmanager
+def deferred_rating_updates():
+    """
+    Один пересчёт рейтингов на весь блок.
+
+    Каскадное удаление пользователя или произведения удаляет
+    отзывы по одному, и без этого каждый отзыв пересчитывал бы
+    рейтинг отдельным запросом.
+    """
+    title_ids = set()
+    token = _deferred_title_ids.set(title_ids)
+    try:
+        yield
+    finally:
+        _deferred_title_ids.reset(token)
+    if title_ids and _update_ratings(Title.objects.filter(pk__in=title_ids)):
+        ratings_changed.send(sender=Title, title_ids=sorted(title_ids))
+
+
+def rebuild_ratings(batch_size: int = 10000) -> int:
+    """
+    Массовый пересчёт рейтингов всех произведений.
+
+    Произведения обновляются диапазонами первичного ключа,
+    чтобы не держать блокировку на всей таблице.
+
+    Returns:
+        Количество произведений, у которых изменился рейтинг.
+    """
+    updated = 0
+    last_pk = 0
+    while True:
+        pks = list(
+            Title.objects.filter(pk__gt=last_pk)
+            .order_by('pk')
+            .values_list('pk', flat=True)[:batch_size]
+        )
+        if not pks:
+            return updated
+        changed = _update_ratings(
+            Title.objects.filter(pk__gte=pks[0], pk__lte=pks[-1]),
+        )
+        if changed:
+            ratings_changed.send(sender=Title, title_ids=pks)
+        updated += changed
+        last_pk = pks[-1]
+
+
+def find_inconsistent_ratings():
+    """
+    Поиск произведений с устаревшим рейтингом.
+
+    Yields:
+        Кортежи (id, сохранённый рейтинг, фактический рейтинг,
+        сохранённое количество, фактическое количество).
+    """
+    titles = Title.objects.order_by('pk').annotate(
+        actual_rating=Avg('reviews__score'),
+        actual_count=Count('reviews'),
+    ).values_list(
+        'pk',
+        'rating',
+        'actual_rating',
+        'reviews_count',
+        'actual_count',
+    )
+    for row in titles.iterator():
+        pk, rating, actual_rating, count, actual_count = row
+        if count != actual_count or not _same_rating(rating, actual_rating):
+            yield row
+
+
+def _same_rating(stored, actual) -> bool:
+    if stored is None or actual is None:
+        return stored is actual
+    return abs(stored - actual) < RATING_PRECISION
@@ -0,0 +1,20 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from reviews.models import Review
+from reviews.ratings import update_title_rating
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def update_rating(sender, instance, **kwargs):
+    """
+    Пересчёт рейтинга произведения при изменении отзыва.
+
+    Если отзыв перенесён к другому произведению (например, в админке),
+    пересчитывается и рейтинг прежнего.
+    """
+    title_ids = {instance.title_id, getattr(instance, 'loaded_title_id', None)}
+    for title_id in sorted(title_ids - {None}):
+        update_title_rating(title_id)
+    instance.loaded_title_id = instance.title_id
@@ -1 +0,0 @@
-default_app_config = 'users.apps.UsersAppConfig'
@@ -0,0 +1,66 @@
+import time
+
+from django.core.management import BaseCommand
+
+from users.outbox import MAX_ATTEMPTS, send_pending_emails
+
+
+class Command(BaseCommand):
+    help = 'Отправка писем из очереди исходящих.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=100,
+            help='Количество писем, отправляемых через одно соединение.',
+        )
+        parser.add_argument(
+            '--max-attempts',
+            type=int,
+            default=MAX_ATTEMPTS,
+            help='После скольких неудачных попыток письмо не отправлять.',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Работать постоянно, проверяя очередь с интервалом.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5,
+            help='Пауза в секундах, если очередь пуста.',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            try:
+                sent, failed = self.drain(options)
+            except Exception as error:
+                if not options['loop']:
+                    raise
+                # Сбой базы или почты не должен останавливать обработчик.
+                self.stderr.write(f'Ошибка отправки писем: {error!r}')
+                time.sleep(options['interval'])
+                continue
+            if sent or failed:
+                self.stdout.write(
+                    f'Отправлено писем: {sent}, с ошибкой: {failed}',
+                )
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
+
+    def drain(self, options):
+        """Отправка пачек, пока в очереди есть готовые письма."""
+        total_sent = total_failed = 0
+        while True:
+            sent, failed = send_pending_emails(
+                batch_size=options['batch_size'],
+                max_attempts=options['max_attempts'],
+            )
+            total_sent += sent
+            total_failed += failed
+            if sent + failed < options['batch_size']:
+                return total_sent, total_failed
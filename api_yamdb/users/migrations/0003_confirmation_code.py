@@ -0,0 +1,33 @@
+# Generated by Django 3.2 on 2026-10-18 01:41
+
+from django.db import migrations
+import users.models
+
+
+def fill_confirmation_codes(apps, schema_editor):
+    User = apps.get_model('users', 'User')
+    missing = User.objects.filter(confirmation_code__isnull=True)
+    for pk in missing.values_list('pk', flat=True).iterator():
+        User.objects.filter(pk=pk).update(
+            confirmation_code=users.models.generate_confirmation_code(),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_outgoing_email'),
+    ]
+
+    operations = [
+        migrations.AlterModelManagers(
+            name='user',
+            managers=[
+                ('objects', users.models.YamdbUserManager()),
+            ],
+        ),
+        migrations.RunPython(
+            fill_confirmation_codes,
+            migrations.RunPython.noop,
+        ),
+    ]
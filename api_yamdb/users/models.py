@@ -1,5 +1,7 @@
-from django.contrib.auth.models import AbstractUser
+from django.contrib.auth.models import AbstractUser, UserManager
 from django.db import models
+from django.utils import timezone
+from django.utils.crypto import get_random_string
 
 from users.validators import validate_username
 
@@ -14,6 +16,27 @@ CHOICES = [
     (MODERATOR, MODERATOR),
 ]
 
+CONFIRMATION_CODE_LENGTH = 20
+
+
+def generate_confirmation_code() -> str:
+    return get_random_string(CONFIRMATION_CODE_LENGTH)
+
+
+class YamdbUserManager(UserManager):
+    def bulk_create(self, objs, *args, **kwargs):
+        """
+        Массовое создание пользователей с кодами подтверждения.
+
+        Коды заполняются до вставки, сигналы на каждую строку
+        не отправляются.
+        """
+        return super().bulk_create(
+            (user.fill_confirmation_code() for user in objs),
+            *args,
+            **kwargs,
+        )
+
 
 class User(AbstractUser):
     username = models.CharField(
@@ -60,6 +83,13 @@ class User(AbstractUser):
         null=True,
         blank=False,
     )
+    token_version = models.PositiveIntegerField(
+        'версия токенов',
+        default=0,
+        editable=False,
+    )
+
+    objects = YamdbUserManager()
 
     class Meta:
         ordering = ('id',)
@@ -70,6 +100,16 @@ class User(AbstractUser):
     def __str__(self):
         return self.username
 
+    def save(self, *args, **kwargs):
+        """Код подтверждения пишется тем же запросом, что и пользователь."""
+        self.fill_confirmation_code()
+        super().save(*args, **kwargs)
+
+    def fill_confirmation_code(self):
+        if not self.confirmation_code:
+            self.confirmation_code = generate_confirmation_code()
+        return self
+
     @property
     def is_user(self):
         return self.role == USER
@@ -81,3 +121,83 @@ class User(AbstractUser):
     @property
     def is_admin(self):
         return self.role == ADMIN or self.is_superuser
+
+
+class OutgoingEmailQuerySet(models.QuerySet):
+    def pending(self, max_attempts: int):
+        """Неотправленные письма, время очередной попытки которых пришло."""
+        return self.filter(
+            sent_at__isnull=True,
+            attempts__lt=max_attempts,
+            next_attempt_at__lte=timezone.now(),
+        )
+
+
+class OutgoingEmail(models.Model):
+    """
+    Очередь исходящих писем.
+
+    Attributes:
+        subject: Тема письма.
+        body: Текст письма.
+        from_email: Адрес отправителя.
+        recipient: Адрес получателя.
+        created: Время постановки в очередь.
+        sent_at: Время успешной отправки.
+        attempts: Количество попыток отправки.
+        next_attempt_at: Время следующей попытки.
+        last_error: Текст последней ошибки отправки.
+    """
+    subject = models.CharField(
+        'тема',
+        max_length=255,
+    )
+    body = models.TextField(
+        'текст',
+    )
+    from_email = models.EmailField(
+        'отправитель',
+        max_length=254,
+    )
+    recipient = models.EmailField(
+        'получатель',
+        max_length=254,
+    )
+    created = models.DateTimeField(
+        'поставлено в очередь',
+        auto_now_add=True,
+    )
+    sent_at = models.DateTimeField(
+        'отправлено',
+        null=True,
+        blank=True,
+    )
+    attempts = models.PositiveSmallIntegerField(
+        'попыток',
+        default=0,
+    )
+    next_attempt_at = models.DateTimeField(
+        'следующая попытка',
+        default=timezone.now,
+    )
+    last_error = models.TextField(
+        'последняя ошибка',
+        blank=True,
+    )
+
+    objects = OutgoingEmailQuerySet.as_manager()
+
+    class Meta:
+        ordering = ('next_attempt_at',)
+        verbose_name = 'Исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+        indexes = [
+            models.Index(
+                fields=('next_attempt_at',),
+                condition=models.Q(sent_at__isnull=True),
+                name='outgoing_email_pending_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.recipient}: {self.subject}'
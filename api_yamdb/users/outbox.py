@@ -0,0 +1,91 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from users.models import OutgoingEmail
+
+MAX_ATTEMPTS = 5
+RETRY_DELAY = timedelta(seconds=30)
+MAX_RETRY_DELAY = timedelta(hours=1)
+SENT_FIELDS = ('sent_at', 'attempts', 'next_attempt_at', 'last_error')
+
+
+def enqueue_email(subject: str, body: str, recipient: str) -> OutgoingEmail:
+    """Постановка письма в очередь вместо отправки в запросе."""
+    return OutgoingEmail.objects.create(
+        subject=subject,
+        body=body,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        recipient=recipient,
+    )
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """Экспоненциальная задержка перед повторной попыткой."""
+    return min(RETRY_DELAY * 2 ** (attempts - 1), MAX_RETRY_DELAY)
+
+
+def mark_failed(email: OutgoingEmail, error: Exception) -> None:
+    email.attempts += 1
+    email.last_error = str(error) or type(error).__name__
+    email.next_attempt_at = timezone.now() + retry_delay(email.attempts)
+
+
+def send_pending_emails(
+        batch_size: int = 100,
+        max_attempts: int = MAX_ATTEMPTS,
+) -> tuple:
+    """
+    Отправка одной пачки писем из очереди.
+
+    Письма блокируются через SELECT ... FOR UPDATE SKIP LOCKED,
+    поэтому несколько обработчиков не отправят одно письмо дважды.
+    Вся пачка отправляется через одно соединение с почтовым сервером.
+
+    Returns:
+        Количество отправленных и неотправленных писем.
+    """
+    sent = failed = 0
+    with transaction.atomic():
+        emails = list(
+            OutgoingEmail.objects.pending(max_attempts)
+            .select_for_update(skip_locked=True)[:batch_size]
+        )
+        if not emails:
+            return sent, failed
+        connection = get_connection()
+        try:
+            connection.open()
+        except Exception as error:
+            # Почтовый сервер недоступен: попытка засчитывается
+            # всей пачке, и письма откладываются.
+            for email in emails:
+                mark_failed(email, error)
+            OutgoingEmail.objects.bulk_update(emails, SENT_FIELDS)
+            return sent, len(emails)
+        try:
+            for email in emails:
+                message = EmailMessage(
+                    email.subject,
+                    email.body,
+                    email.from_email,
+                    [email.recipient],
+                    connection=connection,
+                )
+                try:
+                    message.send()
+                except Exception as error:
+                    mark_failed(email, error)
+                    failed += 1
+                else:
+                    email.attempts += 1
+                    email.sent_at = timezone.now()
+                    email.last_error = ''
+                    sent += 1
+        finally:
+            connection.close()
+        OutgoingEmail.objects.bulk_update(emails, SENT_FIELDS)
+    return sent, failed
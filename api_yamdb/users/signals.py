@@ -1,14 +0,0 @@
-from django.contrib.auth.tokens import default_token_generator
-from django.db.models.signals import post_save
-from django.dispatch import receiver
-from users.models import User
-
-
-@receiver(post_save, sender=User)
-def post_save(sender, instance, created, **kwargs):
-    if created:
-        confirmation_code = default_token_generator.make_token(
-            instance,
-        )
-        instance.confirmation_code = confirmation_code
-        instance.save()
@@ -0,0 +1,43 @@
+"""Масштабы синтетического набора данных для бенчмарков."""
+from dataclasses import asdict, dataclass
+from io import StringIO
+
+from django.core.management import call_command
+
+
+@dataclass
+class Scale:
+    users: int = 200
+    categories: int = 5
+    genres: int = 20
+    titles: int = 1000
+    genres_per_title: int = 2
+    reviews: int = 10000
+    comments: int = 20000
+
+    @classmethod
+    def preset(cls, name: str) -> 'Scale':
+        factor = {'small': 0.1, 'medium': 1, 'large': 10}[name]
+        scale = cls()
+        for field in ('users', 'titles', 'reviews', 'comments'):
+            setattr(scale, field, max(1, int(getattr(scale, field) * factor)))
+        return scale
+
+    def as_dict(self):
+        return asdict(self)
+
+
+def generate(scale: Scale, seed: int = 0) -> None:
+    """Заполнение базы командой generate_data."""
+    call_command(
+        'generate_data',
+        users=scale.users,
+        categories=scale.categories,
+        genres=scale.genres,
+        titles=scale.titles,
+        genres_per_title=scale.genres_per_title,
+        reviews=scale.reviews,
+        comments=scale.comments,
+        seed=seed,
+        stdout=StringIO(),
+    )
@@ -0,0 +1,149 @@
+"""
+Нагрузочный тест эндпоинтов чтения по HTTP.
+
+Запускается против работающего сервера, например для сравнения
+синхронного и асинхронного режима:
+
+    gunicorn api_yamdb.wsgi:application -w 2 --bind 0:8000
+    gunicorn api_yamdb.asgi:application -w 2 --bind 0:8001 \\
+        -k uvicorn.workers.UvicornWorker
+    python benchmarks/loadtest.py http://localhost:8000 http://localhost:8001
+
+Или сам запускает gunicorn с api_yamdb/gunicorn.conf.py для каждой
+конфигурации (переменные GUNICORN_* через пробел) и сравнивает их:
+
+    python benchmarks/loadtest.py --config "GUNICORN_WORKERS=4 \
+        GUNICORN_THREADS=1" --config "GUNICORN_WORKERS=2 GUNICORN_THREADS=8"
+"""
+import argparse
+import contextlib
+import os
+import shlex
+import statistics
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError, URLError
+from urllib.request import urlopen
+
+PROJECT_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'api_yamdb',
+)
+PATHS = (
+    '/api/v1/titles/',
+    '/api/v1/genres/',
+    '/api/v1/categories/',
+    '/api/v1/titles/1/',
+    '/api/v1/titles/1/reviews/',
+)
+
+
+def fetch(url: str, timeout: float):
+    started = time.perf_counter()
+    try:
+        with urlopen(url, timeout=timeout) as response:
+            response.read()
+            ok = response.status == 200
+    except (HTTPError, URLError, OSError):
+        ok = False
+    return time.perf_counter() - started, ok
+
+
+def percentile(values, percent: float) -> float:
+    values = sorted(values)
+    index = min(len(values) - 1, round(percent / 100 * (len(values) - 1)))
+    return values[index]
+
+
+def run(base_url, paths, concurrency, requests, timeout):
+    """Результаты одного прогона: задержки в мс, RPS и число ошибок."""
+    urls = [base_url.rstrip('/') + paths[i % len(paths)]
+            for i in range(requests)]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(lambda url: fetch(url, timeout), urls))
+    elapsed = time.perf_counter() - started
+    latencies = [latency * 1000 for latency, _ in results]
+    return {
+        'target': base_url,
+        'concurrency': concurrency,
+        'requests': requests,
+        'errors': sum(not ok for _, ok in results),
+        'rps': requests / elapsed,
+        'p50': percentile(latencies, 50),
+        'p95': percentile(latencies, 95),
+        'p99': percentile(latencies, 99),
+        'mean': statistics.mean(latencies),
+    }
+
+
+@contextlib.contextmanager
+def serve(config: str, app: str, port: int, paths, timeout: float = 30):
+    """Gunicorn с переменными окружения из config на время прогона."""
+    env = dict(os.environ)
+    env.update(item.split('=', 1) for item in shlex.split(config))
+    env['GUNICORN_BIND'] = f'127.0.0.1:{port}'
+    env.setdefault('GUNICORN_ACCESSLOG', '')
+    server = subprocess.Popen(
+        ('gunicorn', app, '-c', 'gunicorn.conf.py'), cwd=PROJECT_DIR, env=env,
+    )
+    url = f'http://127.0.0.1:{port}'
+    try:
+        deadline = time.monotonic() + timeout
+        while not fetch(url + paths[0], timeout=1)[1]:
+            if server.poll() is not None or time.monotonic() > deadline:
+                raise RuntimeError(f'gunicorn не запустился: {config}')
+            time.sleep(0.2)
+        yield url
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def report(result):
+    print(
+        '{target:<32} c={concurrency:<4} rps={rps:>8.1f} '
+        'p50={p50:>7.1f}ms p95={p95:>7.1f}ms p99={p99:>7.1f}ms '
+        'errors={errors}'.format(**result),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('targets', nargs='*', help='Адреса серверов.')
+    parser.add_argument(
+        '--config', action='append', dest='configs', default=[],
+        help='Переменные GUNICORN_* для запуска сервера, например '
+             '"GUNICORN_WORKERS=4 GUNICORN_THREADS=2".',
+    )
+    parser.add_argument('--app', default='api_yamdb.wsgi:application')
+    parser.add_argument('--port', type=int, default=8100)
+    parser.add_argument('--path', action='append', dest='paths')
+    parser.add_argument(
+        '--concurrency', type=int, action='append',
+        help='Число одновременных клиентов, можно указать несколько раз.',
+    )
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--timeout', type=float, default=30)
+    args = parser.parse_args()
+    if not args.targets and not args.configs:
+        parser.error('укажите адреса серверов или --config')
+    paths = args.paths or PATHS
+    levels = args.concurrency or (1, 16, 64)
+
+    def load(target, label):
+        for concurrency in levels:
+            result = run(
+                target, paths, concurrency, args.requests, args.timeout,
+            )
+            report({**result, 'target': label})
+
+    for target in args.targets:
+        load(target, target)
+    for config in args.configs:
+        with serve(config, args.app, args.port, paths) as target:
+            load(target, config)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,299 @@
+"""
+Бенчмарк API на синтетических данных.
+
+Заполняет базу набором заданного масштаба и выполняет запросы
+к маршрутам api/urls.py внутри процесса, без HTTP-сервера:
+
+    python benchmarks/run.py --scale medium --requests 200
+    python benchmarks/run.py --compare benchmarks/results/<прошлый>.json
+
+По умолчанию база - файл SQLite в benchmarks/. Для PostgreSQL
+задайте переменные DB_ENGINE, DB_NAME, DB_HOST и т.д., как для
+проекта: данные создаются в отдельной базе test_<DB_NAME>,
+сама база проекта не изменяется.
+Результаты сохраняются в benchmarks/results/<время>.json.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.join(os.path.dirname(BENCH_DIR), 'api_yamdb')
+RESULTS_DIR = os.path.join(BENCH_DIR, 'results')
+SQLITE_PATH = os.path.join(BENCH_DIR, 'bench.sqlite3')
+
+sys.path.insert(0, PROJECT_DIR)
+sys.path.insert(0, BENCH_DIR)
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+if not os.getenv('DB_HOST') and not os.getenv('DB_ENGINE'):
+    os.environ['DB_ENGINE'] = 'django.db.backends.sqlite3'
+    os.environ['DB_NAME'] = SQLITE_PATH
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.core.management import call_command  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test.utils import (  # noqa: E402
+    CaptureQueriesContext,
+    override_settings,
+    setup_test_environment,
+)
+from rest_framework.test import APIClient  # noqa: E402
+
+from dataset import Scale, generate  # noqa: E402
+from reviews.models import Comment, Review, Title  # noqa: E402
+from users.models import User  # noqa: E402
+
+DUMMY_CACHE = {
+    'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+}
+
+
+@dataclass
+class Endpoint:
+    name: str
+    url: Callable
+    method: str = 'get'
+    authenticated: bool = False
+    data: Optional[Callable] = None
+
+
+class Targets:
+    """Случайные объекты для адресов вложенных ресурсов."""
+
+    def __init__(self, seed: int, size: int = 500):
+        self.rng = random.Random(seed)
+        self.titles = list(
+            Title.objects.order_by('?').values_list('pk', flat=True)[:size],
+        )
+        self.reviews = list(
+            Review.objects.order_by('?').values_list('title_id', 'pk')[:size],
+        )
+        self.comments = list(
+            Comment.objects.order_by('?').values_list(
+                'review__title_id', 'review_id', 'pk',
+            )[:size],
+        )
+
+    def title(self):
+        return self.rng.choice(self.titles)
+
+    def review(self):
+        return self.rng.choice(self.reviews)
+
+    def comment(self):
+        return self.rng.choice(self.comments)
+
+
+def endpoints(targets: Targets):
+    def reviews(suffix=''):
+        return lambda: '/api/v1/titles/{}/reviews/{}'.format(
+            targets.title(), suffix,
+        )
+
+    def review():
+        return '/api/v1/titles/{}/reviews/{}/'.format(*targets.review())
+
+    def comments(suffix=''):
+        return lambda: '/api/v1/titles/{}/reviews/{}/comments/{}'.format(
+            *targets.review(), suffix,
+        )
+
+    def comment():
+        return '/api/v1/titles/{}/reviews/{}/comments/{}/'.format(
+            *targets.comment(),
+        )
+
+    return (
+        Endpoint('titles-list', lambda: '/api/v1/titles/'),
+        Endpoint(
+            'titles-list-filtered',
+            lambda: '/api/v1/titles/?genre=genre-1&year_min=2000',
+        ),
+        Endpoint(
+            'titles-detail', lambda: f'/api/v1/titles/{targets.title()}/',
+        ),
+        Endpoint(
+            'titles-search',
+            lambda: '/api/v1/titles/search/?q=Произведение {}'.format(
+                targets.title() % 100,
+            ),
+        ),
+        Endpoint('genres-list', lambda: '/api/v1/genres/'),
+        Endpoint('categories-list', lambda: '/api/v1/categories/'),
+        Endpoint('reviews-list', reviews()),
+        Endpoint('reviews-list-cursor', reviews('?pagination=cursor')),
+        Endpoint('reviews-detail', review),
+        Endpoint('comments-list', comments()),
+        Endpoint('comments-detail', comment),
+        Endpoint('users-me', lambda: '/api/v1/users/me/', authenticated=True),
+        Endpoint(
+            'comments-create', comments(), method='post', authenticated=True,
+            data=lambda: {'text': 'Комментарий из бенчмарка'},
+        ),
+    )
+
+
+def percentile(values, percent: float) -> float:
+    values = sorted(values)
+    index = min(len(values) - 1, round(percent / 100 * (len(values) - 1)))
+    return values[index]
+
+
+def measure(endpoint: Endpoint, client, requests: int, warmup: int) -> dict:
+    latencies, queries, errors = [], [], 0
+    for i in range(warmup + requests):
+        data = endpoint.data() if endpoint.data else None
+        url = endpoint.url()
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            response = getattr(client, endpoint.method)(
+                url, data, format='json',
+            )
+            elapsed = time.perf_counter() - started
+        if i < warmup:
+            continue
+        latencies.append(elapsed * 1000)
+        queries.append(len(captured))
+        errors += response.status_code >= 400
+    return {
+        'requests': requests,
+        'errors': errors,
+        'p50_ms': percentile(latencies, 50),
+        'p95_ms': percentile(latencies, 95),
+        'p99_ms': percentile(latencies, 99),
+        'mean_ms': statistics.mean(latencies),
+        'rps': requests / (sum(latencies) / 1000),
+        'queries': statistics.mean(queries),
+    }
+
+
+def prepare_database(scale: Scale, seed: int, reuse: bool) -> None:
+    if connection.settings_dict['NAME'] == SQLITE_PATH:
+        if not reuse:
+            connection.close()
+            if os.path.exists(SQLITE_PATH):
+                os.remove(SQLITE_PATH)
+        call_command('migrate', verbosity=0)
+    else:
+        # База проекта из DB_* не очищается: данные создаются
+        # в отдельной базе test_<имя>, она остаётся для --reuse-db.
+        connection.creation.create_test_db(
+            verbosity=0, keepdb=True, serialize=False,
+        )
+    if reuse and Title.objects.exists():
+        return
+    call_command('flush', interactive=False, verbosity=0)
+    generate(scale, seed)
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ('git', 'rev-parse', '--short', 'HEAD'),
+            cwd=BENCH_DIR, stderr=subprocess.DEVNULL, text=True,
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def report(results: dict, baseline: Optional[dict]) -> None:
+    print(
+        f'{"endpoint":<24}{"p50":>9}{"p95":>9}{"p99":>9}'
+        f'{"rps":>9}{"queries":>9}{"errors":>8}',
+    )
+    for name, result in results.items():
+        line = (
+            f'{name:<24}{result["p50_ms"]:>9.2f}{result["p95_ms"]:>9.2f}'
+            f'{result["p99_ms"]:>9.2f}{result["rps"]:>9.1f}'
+            f'{result["queries"]:>9.1f}{result["errors"]:>8}'
+        )
+        old = (baseline or {}).get(name)
+        if old:
+            change = (result['p50_ms'] / old['p50_ms'] - 1) * 100
+            line += f'   p50 {change:+.1f}%, queries {old["queries"]:.1f}'
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument(
+        '--scale', choices=('small', 'medium', 'large'), default='small',
+    )
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--warmup', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument(
+        '--endpoint', action='append',
+        help='Только указанные эндпоинты, можно несколько раз.',
+    )
+    parser.add_argument(
+        '--cache', action='store_true',
+        help='Не отключать кэш ответов.',
+    )
+    parser.add_argument(
+        '--reuse-db', action='store_true',
+        help='Использовать уже заполненную базу.',
+    )
+    parser.add_argument('--output', help='Файл для результатов JSON.')
+    parser.add_argument('--compare', help='Прошлые результаты для сравнения.')
+    args = parser.parse_args()
+
+    setup_test_environment()
+    scale = Scale.preset(args.scale)
+    prepare_database(scale, args.seed, args.reuse_db)
+    targets = Targets(args.seed)
+    user = User.objects.order_by('pk').first()
+    clients = {False: APIClient(), True: APIClient()}
+    clients[True].force_authenticate(user)
+
+    results = {}
+    with override_settings(**({} if args.cache else {'CACHES': DUMMY_CACHE})):
+        for endpoint in endpoints(targets):
+            if args.endpoint and endpoint.name not in args.endpoint:
+                continue
+            results[endpoint.name] = measure(
+                endpoint, clients[endpoint.authenticated],
+                args.requests, args.warmup,
+            )
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)['endpoints']
+    report(results, baseline)
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, time.strftime('%Y%m%d-%H%M%S.json'),
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump({
+            'meta': {
+                'revision': git_revision(),
+                'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+                'database': connection.vendor,
+                'database_name': connection.settings_dict['NAME'],
+                'scale': scale.as_dict(),
+                'seed': args.seed,
+                'cache': args.cache,
+                'python': platform.python_version(),
+                'django': django.get_version(),
+            },
+            'endpoints': results,
+        }, f, ensure_ascii=False, indent=2)
+    print(f'Результаты: {output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,9 +1,83 @@
+import os
 import sys
 from os.path import abspath, dirname, join
 
+import pytest
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from rest_framework.test import APIClient
+
 root_dir = dirname(dirname(abspath(__file__)))
 sys.path.append(root_dir)
 infra_dir_path = join(root_dir, 'infra')
 
 pytest_plugins = [
 ]
+
+if not os.getenv('DB_HOST'):
+    # Без доступного PostgreSQL тесты с базой идут на SQLite в памяти.
+    settings.DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': ':memory:',
+        },
+    }
+    connections.__dict__.pop('settings', None)
+    connections._settings = settings.DATABASES
+    if hasattr(connections._connections, 'default'):
+        del connections['default']
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def query_inspector(request, settings):
+    """
+    Запросы API в тестах проверяются на N+1.
+
+    Тест, которому повторы нужны, помечается allow_repeated_queries.
+    """
+    if request.node.get_closest_marker('allow_repeated_queries'):
+        return
+    settings.QUERY_INSPECTOR = True
+    settings.QUERY_INSPECTOR_RAISE = True
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def user(django_user_model):
+    return django_user_model.objects.create(
+        username='TestUser',
+        email='testuser@yamdb.fake',
+    )
+
+
+@pytest.fixture
+def admin(django_user_model):
+    return django_user_model.objects.create(
+        username='TestAdmin',
+        email='testadmin@yamdb.fake',
+        role='admin',
+    )
+
+
+@pytest.fixture
+def user_client(user):
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+@pytest.fixture
+def admin_client(admin):
+    client = APIClient()
+    client.force_authenticate(admin)
+    return client
@@ -0,0 +1,70 @@
+import asyncio
+import time
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from django.urls import path
+
+from api.async_views import async_read_view
+from api.metrics import REGISTRY
+from api.views import GenreViewSet
+from reviews.models import Genre
+
+DELAY = 0.3
+REQUESTS = 4
+
+
+def slow_genres(request, *args, **kwargs):
+    time.sleep(DELAY)
+    view = GenreViewSet.as_view({'get': 'list'})
+    return view(request, *args, **kwargs)
+
+
+# Модуль служит urlconf: медленная вьюха чтения под ASGI.
+urlpatterns = [
+    path('slow/', async_read_view(slow_genres), name='slow-genres'),
+]
+
+
+@pytest.fixture
+def asgi(settings):
+    settings.ROOT_URLCONF = __name__
+    settings.METRICS_SAMPLE_RATE = 1
+    # Кэш ответов отдал бы повторные запросы без SQL.
+    settings.CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+        },
+    }
+    REGISTRY.reset()
+    yield
+    REGISTRY.reset()
+
+
+@async_to_sync
+async def fetch_concurrently(client, url, count):
+    return await asyncio.gather(*(client.get(url) for _ in range(count)))
+
+
+@pytest.mark.django_db(transaction=True)
+class TestAsyncMiddleware:
+
+    def test_reads_run_concurrently(self, asgi):
+        Genre.objects.create(name='Драма', slug='drama')
+        started = time.perf_counter()
+        responses = fetch_concurrently(AsyncClient(), '/slow/', REQUESTS)
+        elapsed = time.perf_counter() - started
+        assert [response.status_code for response in responses] == (
+            [200] * REQUESTS
+        )
+        assert elapsed < DELAY * REQUESTS / 2
+
+    def test_queries_counted_in_view_thread(self, asgi):
+        Genre.objects.create(name='Драма', slug='drama')
+        fetch_concurrently(AsyncClient(), '/slow/', REQUESTS)
+        counts, total = REGISTRY.histograms['queries'].series[
+            ('slow-genres', 'GET')
+        ]
+        assert sum(counts) == REQUESTS
+        assert total >= 2 * REQUESTS
@@ -0,0 +1,83 @@
+import asyncio
+import threading
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.urls import resolve
+from rest_framework.test import APIRequestFactory
+
+from api.async_views import (
+    ASYNC_READ_ROUTES,
+    async_read_patterns,
+    async_read_view,
+)
+from api.urls import router
+from api.views import GenreViewSet
+from reviews.models import Genre
+
+
+def thread_recording_view(threads):
+    view = GenreViewSet.as_view({'get': 'list', 'post': 'create'})
+
+    def recording(request, *args, **kwargs):
+        threads.append(threading.get_ident())
+        return view(request, *args, **kwargs)
+
+    return recording
+
+
+@pytest.mark.django_db(transaction=True)
+class TestAsyncViews:
+
+    def test_read_runs_in_pool_thread(self):
+        Genre.objects.create(name='Драма', slug='drama')
+        threads = []
+        view = async_read_view(thread_recording_view(threads))
+        assert asyncio.iscoroutinefunction(view)
+        request = APIRequestFactory().get('/api/v1/genres/')
+        response = async_to_sync(view)(request)
+        assert response.status_code == 200
+        assert response.data['results'][0]['slug'] == 'drama'
+        assert threads[0] != threading.get_ident()
+
+    def test_write_is_not_offloaded_to_pool(self):
+        threads = []
+        view = async_read_view(thread_recording_view(threads))
+        request = APIRequestFactory().post('/api/v1/genres/', {})
+        response = async_to_sync(view)(request)
+        assert response.status_code == 401
+
+
+class TestAsyncRoutes:
+
+    def test_routes_exist(self):
+        names = {
+            'titles-list': '/api/v1/titles/',
+            'titles-detail': '/api/v1/titles/1/',
+            'titles-search': '/api/v1/titles/search/',
+            'genres-list': '/api/v1/genres/',
+            'categories-list': '/api/v1/categories/',
+            'reviews-list': '/api/v1/titles/1/reviews/',
+            'reviews-detail': '/api/v1/titles/1/reviews/1/',
+            'comments-list': '/api/v1/titles/1/reviews/1/comments/',
+            'comments-detail': '/api/v1/titles/1/reviews/1/comments/1/',
+        }
+        assert set(names) == set(ASYNC_READ_ROUTES)
+        for name, url in names.items():
+            assert resolve(url).url_name == name
+
+    def test_patterns_wrapped_only_when_enabled(self, settings):
+        settings.ASYNC_VIEWS = False
+        patterns = async_read_patterns(router.get_urls())
+        assert not any(
+            asyncio.iscoroutinefunction(pattern.callback)
+            for pattern in patterns
+        )
+        settings.ASYNC_VIEWS = True
+        patterns = {
+            pattern.name: pattern.callback
+            for pattern in async_read_patterns(router.get_urls())
+        }
+        for name in ASYNC_READ_ROUTES:
+            assert asyncio.iscoroutinefunction(patterns[name])
+        assert not asyncio.iscoroutinefunction(patterns['users-list'])
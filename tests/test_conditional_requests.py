@@ -0,0 +1,170 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils.http import http_date
+
+from api.cache import comments_scope, get_versions
+from reviews.models import Category, Comment, Genre, Review, Title
+
+
+@pytest.fixture
+def review(user):
+    category = Category.objects.create(name='Фильмы', slug='films')
+    genre = Genre.objects.create(name='Драма', slug='drama')
+    title = Title.objects.create(name='Фильм', year=2000, category=category)
+    title.genre.add(genre)
+    review = Review.objects.create(
+        title=title, author=user, text='Отзыв', score=7,
+    )
+    Comment.objects.create(review=review, author=user, text='Комментарий')
+    return review
+
+
+def urls(review):
+    title = f'/api/v1/titles/{review.title_id}/'
+    comments = f'{title}reviews/{review.pk}/comments/'
+    return (
+        '/api/v1/titles/',
+        title,
+        '/api/v1/categories/',
+        '/api/v1/genres/',
+        f'{title}reviews/',
+        f'{title}reviews/{review.pk}/',
+        comments,
+        f'{comments}{review.comments.get().pk}/',
+    )
+
+
+def add_review(review):
+    author = type(review.author).objects.create(
+        username='other', email='other@yamdb.fake',
+    )
+    Review.objects.create(
+        title=review.title, author=author, text='Новый', score=1,
+    )
+
+
+def add_comment(review):
+    Comment.objects.create(review=review, author=review.author, text='Ещё')
+
+
+def delete_comment(review):
+    review.comments.get().delete()
+
+
+def rename_title(review):
+    title = Title.objects.get(pk=review.title_id)
+    title.name = 'Другое'
+    title.save()
+
+
+def edit_review(review):
+    review.text = 'Изменён'
+    review.save()
+
+
+@pytest.mark.django_db
+class TestConditionalRequests:
+
+    def test_validators_and_not_modified(self, api_client, review):
+        for url in urls(review):
+            response = api_client.get(url)
+            assert response.status_code == 200, url
+            assert response.has_header('ETag'), url
+            assert not response.has_header('Last-Modified'), url
+            with CaptureQueriesContext(connection) as captured:
+                cached = api_client.get(
+                    url, HTTP_IF_NONE_MATCH=response['ETag'],
+                )
+            assert cached.status_code == 304, url
+            assert cached['ETag'] == response['ETag']
+            assert not cached.content
+            assert len(captured) == 0, url
+
+    def test_two_writes_in_same_second(self, api_client, review):
+        url = f'/api/v1/titles/{review.title_id}/reviews/'
+        first = api_client.get(url)
+        since = http_date()
+        edit_review(review)
+        api_client.get(url)
+        add_review(review)
+        assert api_client.get(
+            url, HTTP_IF_MODIFIED_SINCE=since,
+        ).status_code == 200
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        assert response.status_code == 200
+        assert response.data['count'] == 2
+
+    def test_etag_depends_on_query(self, api_client, review):
+        url = f'/api/v1/titles/{review.title_id}/reviews/'
+        first = api_client.get(url)
+        second = api_client.get(url, {'compact': 1})
+        assert first['ETag'] != second['ETag']
+        response = api_client.get(
+            url, {'compact': 1}, HTTP_IF_NONE_MATCH=first['ETag'],
+        )
+        assert response.status_code == 200
+
+    @pytest.mark.parametrize('change, url_index', (
+        (add_review, 4),
+        (add_comment, 6),
+        (delete_comment, 6),
+        (rename_title, 4),
+        (edit_review, 6),
+    ))
+    def test_changes_update_validators(
+            self, api_client, review, change, url_index,
+    ):
+        url = urls(review)[url_index]
+        etag = api_client.get(url)['ETag']
+        change(review)
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+
+    def test_username_change_updates_validators(self, api_client, review):
+        url = urls(review)[4]
+        etag = api_client.get(url)['ETag']
+        author = review.author
+        author.username = 'renamed'
+        author.save()
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response.data['results'][0]['author'] == 'renamed'
+
+    def test_upsert_updates_comment_validators(
+            self, api_client, user_client, review,
+    ):
+        url = urls(review)[6]
+        etag = api_client.get(url)['ETag']
+        response = user_client.post(
+            f'/api/v1/titles/{review.title_id}/reviews/?upsert=true',
+            {'text': 'Заменён', 'score': 3},
+        )
+        assert response.status_code == 201
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response.data['results'][0]['review'] == 'Заменён'
+
+    def test_deleted_title_without_reviews(self, api_client, review):
+        title = Title.objects.create(name='Пустое', year=2001)
+        url = f'/api/v1/titles/{title.pk}/reviews/'
+        etag = api_client.get(url)['ETag']
+        title.delete()
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 404
+
+    def test_versions_bumped_again_on_commit(
+            self, review, django_capture_on_commit_callbacks,
+    ):
+        scope = comments_scope(review.pk)
+        with django_capture_on_commit_callbacks(execute=True) as callbacks:
+            add_comment(review)
+            during = get_versions(scope)[scope]
+        assert callbacks
+        assert get_versions(scope)[scope] > during
+
+    def test_write_responses_have_no_validators(self, user_client, review):
+        url = f'/api/v1/titles/{review.title_id}/reviews/{review.pk}/'
+        response = user_client.patch(url, {'text': 'Изменён'})
+        assert response.status_code == 200
+        assert not response.has_header('ETag')
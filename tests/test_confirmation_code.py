@@ -0,0 +1,62 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from users.models import OutgoingEmail, User
+
+
+@pytest.mark.django_db
+class TestConfirmationCode:
+
+    def test_code_is_saved_with_single_insert(self):
+        with CaptureQueriesContext(connection) as captured:
+            user = User.objects.create(username='coder', email='c@yamdb.fake')
+        assert len(captured) == 1
+        assert captured[0]['sql'].startswith('INSERT')
+        user.refresh_from_db()
+        assert user.confirmation_code
+
+    def test_bulk_create_fills_codes(self):
+        User.objects.bulk_create(
+            User(username=f'bulk{i}', email=f'bulk{i}@yamdb.fake')
+            for i in range(3)
+        )
+        codes = set(User.objects.values_list('confirmation_code', flat=True))
+        assert None not in codes
+        assert len(codes) == 3
+
+    def test_emailed_code_returns_token(self, api_client):
+        data = {'username': 'newuser', 'email': 'new@yamdb.fake'}
+        api_client.post('/api/v1/auth/signup/', data)
+        code = User.objects.get(username='newuser').confirmation_code
+        assert code in OutgoingEmail.objects.get().body
+        response = api_client.post(
+            '/api/v1/auth/token/',
+            {'username': 'newuser', 'confirmation_code': code},
+        )
+        assert response.status_code == 201
+        assert 'token' in response.json()
+
+    def test_code_is_single_use(self, api_client, user):
+        data = {
+            'username': user.username,
+            'confirmation_code': user.confirmation_code,
+        }
+        assert api_client.post('/api/v1/auth/token/', data).status_code == 201
+        assert api_client.post('/api/v1/auth/token/', data).status_code == 400
+        user.refresh_from_db()
+        assert user.confirmation_code != data['confirmation_code']
+
+    def test_signup_again_issues_new_code(self, api_client):
+        data = {'username': 'newuser', 'email': 'new@yamdb.fake'}
+        api_client.post('/api/v1/auth/signup/', data)
+        old = User.objects.get(username='newuser').confirmation_code
+        assert api_client.post('/api/v1/auth/signup/', data).status_code == 200
+        new = User.objects.get(username='newuser').confirmation_code
+        assert new != old
+        assert new in OutgoingEmail.objects.latest('pk').body
+        response = api_client.post(
+            '/api/v1/auth/token/',
+            {'username': 'newuser', 'confirmation_code': old},
+        )
+        assert response.status_code == 400
@@ -0,0 +1,157 @@
+import threading
+import time
+
+import pytest
+from django.db import connections
+
+from api.signals import check_persistent_connections
+from api_yamdb import settings
+from api_yamdb.db.postgresql.base import HealthCheckMixin
+from api_yamdb.db.postgresql_pool import base
+
+
+class FakeConnection:
+    def __init__(self, usable=True):
+        self.is_usable_result = usable
+        self.closed = False
+        self.connection = object()
+        self.in_atomic_block = False
+        self.settings_dict = {'CONN_HEALTH_CHECKS': True}
+        self.checks = 0
+        self.queries = 0
+
+    def is_usable(self):
+        self.checks += 1
+        return self.is_usable_result
+
+    def ensure_connection(self):
+        if self.connection is None:
+            self.connection = object()
+        self.queries += 1
+
+    def close(self):
+        self.closed = True
+        self.connection = None
+
+
+class LazyConnection(HealthCheckMixin, FakeConnection):
+    pass
+
+
+class FakePool:
+    def __init__(self, minconn, maxconn, **params):
+        self.size = (minconn, maxconn)
+        self.params = params
+        self.returned = []
+
+    def getconn(self):
+        return object()
+
+    def putconn(self, connection, close=False):
+        self.returned.append((connection, close))
+
+
+class TestPersistentConnections:
+
+    def test_connections_are_persistent_by_default(self):
+        default = settings.DATABASES['default']
+        assert default['CONN_MAX_AGE'] > 0
+        assert default['CONN_HEALTH_CHECKS']
+
+    @pytest.mark.parametrize('usable, closed', ((True, False), (False, True)))
+    def test_broken_connection_closed_on_request(
+            self, monkeypatch, usable, closed,
+    ):
+        connection = FakeConnection(usable)
+        monkeypatch.setattr(connections, 'all', lambda: [connection])
+        check_persistent_connections(sender=self.__class__)
+        assert connection.closed is closed
+
+    def test_connection_in_transaction_is_kept(self, monkeypatch):
+        connection = FakeConnection(usable=False)
+        connection.in_atomic_block = True
+        monkeypatch.setattr(connections, 'all', lambda: [connection])
+        check_persistent_connections(sender=self.__class__)
+        assert not connection.closed
+
+
+    def test_lazy_check_without_queries(self, monkeypatch):
+        connection = LazyConnection(usable=False)
+        monkeypatch.setattr(connections, 'all', lambda: [connection])
+        check_persistent_connections(sender=self.__class__)
+        assert connection.checks == 0
+        assert not connection.closed
+
+    @pytest.mark.parametrize('usable, closed', ((True, False), (False, True)))
+    def test_lazy_check_before_first_query(
+            self, monkeypatch, usable, closed,
+    ):
+        connection = LazyConnection(usable)
+        monkeypatch.setattr(connections, 'all', lambda: [connection])
+        check_persistent_connections(sender=self.__class__)
+        connection.ensure_connection()
+        connection.ensure_connection()
+        assert connection.checks == 1
+        assert connection.closed is closed
+        assert connection.queries == 2
+
+
+class TestConnectionPool:
+
+    @pytest.fixture
+    def wrapper(self, monkeypatch):
+        monkeypatch.setattr(base.pool, 'ThreadedConnectionPool', FakePool)
+        monkeypatch.setattr(base.DatabaseWrapper, '_pools', {})
+        return base.DatabaseWrapper({
+            'ENGINE': 'api_yamdb.db.postgresql_pool',
+            'NAME': 'yamdb',
+            'USER': '',
+            'PASSWORD': '',
+            'HOST': '',
+            'PORT': '',
+            'OPTIONS': {},
+            'POOL': {'MAX_SIZE': 2, 'TIMEOUT': 0.2},
+            'CONN_MAX_AGE': 0,
+            'AUTOCOMMIT': True,
+            'ATOMIC_REQUESTS': False,
+            'TIME_ZONE': None,
+        }, alias='pooled')
+
+    def test_pool_is_shared_per_process(self, wrapper):
+        params = wrapper.get_connection_params()
+        pool = wrapper.get_pool(params)
+        assert pool.pool.size == (1, 2)
+        assert pool.pool.params['database'] == 'yamdb'
+        assert wrapper.get_pool(params) is pool
+
+    def test_close_returns_connection_to_pool(self, wrapper):
+        pool = wrapper.get_pool(wrapper.get_connection_params())
+        connection = pool.getconn()
+        wrapper.connection = connection
+        wrapper.errors_occurred = False
+        wrapper._close()
+        assert pool.pool.returned == [(connection, False)]
+
+    def test_broken_connection_is_discarded(self, wrapper):
+        pool = wrapper.get_pool(wrapper.get_connection_params())
+        wrapper.connection = pool.getconn()
+        wrapper.errors_occurred = True
+        wrapper._close()
+        assert pool.pool.returned[0][1] is True
+
+    def test_exhausted_pool_waits_then_fails(self, wrapper):
+        pool = wrapper.get_pool(wrapper.get_connection_params())
+        pool.getconn()
+        pool.getconn()
+        started = time.monotonic()
+        with pytest.raises(base.pool.PoolError):
+            pool.getconn()
+        assert time.monotonic() - started >= 0.2
+
+    def test_returned_connection_unblocks_waiter(self, wrapper):
+        pool = wrapper.get_pool(wrapper.get_connection_params())
+        pool.timeout = 5
+        first = pool.getconn()
+        pool.getconn()
+        threading.Timer(0.05, pool.putconn, (first,)).start()
+        assert pool.getconn() is not None
@@ -0,0 +1,98 @@
+import pytest
+from django.core import mail
+from django.core.management import call_command
+
+from users.models import OutgoingEmail
+from users.outbox import send_pending_emails
+
+SIGNUP_URL = '/api/v1/auth/signup/'
+
+
+class BrokenBackend:
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def open(self):
+        pass
+
+    def close(self):
+        pass
+
+    def send_messages(self, messages):
+        raise ConnectionError('SMTP недоступен')
+
+
+class UnreachableBackend(BrokenBackend):
+    def open(self):
+        raise ConnectionRefusedError(111, 'Connection refused')
+
+
+class StopLoop(BaseException):
+    pass
+
+
+@pytest.mark.django_db
+class TestEmailOutbox:
+
+    def test_signup_enqueues_email(self, api_client):
+        response = api_client.post(
+            SIGNUP_URL, {'username': 'newuser', 'email': 'new@yamdb.fake'},
+        )
+        assert response.status_code == 200
+        assert len(mail.outbox) == 0
+        email = OutgoingEmail.objects.get()
+        assert email.recipient == 'new@yamdb.fake'
+        assert email.sent_at is None
+
+    def test_worker_sends_batch(self, api_client):
+        for i in range(3):
+            api_client.post(
+                SIGNUP_URL, {'username': f'user{i}', 'email': f'u{i}@ya.fake'},
+            )
+        call_command('send_emails', '--batch-size', '2')
+        assert len(mail.outbox) == 3
+        assert not OutgoingEmail.objects.filter(sent_at__isnull=True).exists()
+
+    def test_failed_email_is_retried_later(self, api_client, settings):
+        settings.EMAIL_BACKEND = 'tests.test_email_outbox.BrokenBackend'
+        api_client.post(
+            SIGNUP_URL, {'username': 'newuser', 'email': 'new@yamdb.fake'},
+        )
+        assert send_pending_emails() == (0, 1)
+        email = OutgoingEmail.objects.get()
+        assert email.attempts == 1
+        assert 'SMTP' in email.last_error
+        assert email.next_attempt_at > email.created
+        assert send_pending_emails() == (0, 0)
+
+    def test_unreachable_server_is_retried_later(self, api_client, settings):
+        settings.EMAIL_BACKEND = 'tests.test_email_outbox.UnreachableBackend'
+        api_client.post(
+            SIGNUP_URL, {'username': 'newuser', 'email': 'new@yamdb.fake'},
+        )
+        assert send_pending_emails() == (0, 1)
+        email = OutgoingEmail.objects.get()
+        assert email.attempts == 1
+        assert 'refused' in email.last_error
+        assert email.next_attempt_at > email.created
+        assert send_pending_emails() == (0, 0)
+
+    def test_loop_survives_errors(self, monkeypatch):
+        from users.management.commands import send_emails
+
+        calls = []
+
+        def failing(**kwargs):
+            calls.append(kwargs)
+            raise ConnectionRefusedError(111, 'Connection refused')
+
+        def sleep(seconds):
+            if len(calls) > 1:
+                raise StopLoop
+        monkeypatch.setattr(send_emails, 'send_pending_emails', failing)
+        monkeypatch.setattr(send_emails.time, 'sleep', sleep)
+        with pytest.raises(StopLoop):
+            call_command('send_emails', '--loop')
+        assert len(calls) == 2
+        with pytest.raises(ConnectionRefusedError):
+            call_command('send_emails')
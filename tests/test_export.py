@@ -0,0 +1,66 @@
+import csv
+import io
+import json
+
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Category, Comment, Genre, Review, Title
+
+
+@pytest.fixture
+def catalog(user):
+    category = Category.objects.create(name='Фильмы', slug='films')
+    genres = [
+        Genre.objects.create(name='Драма', slug='drama'),
+        Genre.objects.create(name='Комедия', slug='comedy'),
+    ]
+    first = Title.objects.create(name='Первое', year=2000, category=category)
+    first.genre.set(genres)
+    Title.objects.create(name='Без жанра', year=2001)
+    third = Title.objects.create(name='Третье', year=2002)
+    third.genre.add(genres[0])
+    review = Review.objects.create(
+        title=first, author=user, text='Отзыв', score=8,
+    )
+    Comment.objects.create(review=review, author=user, text='Комментарий')
+    return first
+
+
+def read_stream(response):
+    return b''.join(response.streaming_content).decode()
+
+
+@pytest.mark.django_db
+class TestExport:
+
+    def test_titles_ndjson(self, admin_client, catalog):
+        response = admin_client.get('/api/v1/export/titles/')
+        assert response.status_code == 200
+        assert response['Content-Type'] == 'application/x-ndjson'
+        rows = [json.loads(line) for line in read_stream(response).splitlines()]
+        assert [row['genres'] for row in rows] == [
+            ['comedy', 'drama'], [], ['drama'],
+        ]
+        assert rows[0]['category'] == 'films'
+        assert rows[0]['rating'] == 8
+
+    def test_reviews_csv(self, admin_client, catalog, user):
+        response = admin_client.get('/api/v1/export/reviews/?output=csv')
+        rows = list(csv.DictReader(io.StringIO(read_stream(response))))
+        assert rows[0]['author'] == user.username
+        assert rows[0]['score'] == '8'
+
+    def test_export_is_admin_only(self, user_client, api_client):
+        assert user_client.get('/api/v1/export/titles/').status_code == 403
+        assert api_client.get('/api/v1/export/titles/').status_code == 401
+
+    def test_bad_parameters(self, admin_client):
+        assert admin_client.get('/api/v1/export/users/').status_code == 404
+        response = admin_client.get('/api/v1/export/titles/?output=xml')
+        assert response.status_code == 400
+
+    def test_dump_data_command(self, catalog):
+        out = io.StringIO()
+        call_command('dump_data', 'comments', '--chunk-size', '1', stdout=out)
+        assert json.loads(out.getvalue())['text'] == 'Комментарий'
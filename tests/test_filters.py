@@ -0,0 +1,60 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Genre, Title
+
+
+@pytest.fixture
+def titles():
+    films = Category.objects.create(name='Фильмы', slug='films')
+    filmstrips = Category.objects.create(name='Диафильмы', slug='filmstrips')
+    drama = Genre.objects.create(name='Драма', slug='drama')
+    melodrama = Genre.objects.create(name='Мелодрама', slug='melodrama')
+    for year, category, genre in (
+        (1972, films, drama),
+        (1994, films, melodrama),
+        (1999, filmstrips, drama),
+        (2010, filmstrips, melodrama),
+    ):
+        title = Title.objects.create(
+            name=f'Произведение {year}', year=year, category=category,
+        )
+        title.genre.add(genre)
+
+
+def years(client, query):
+    response = client.get(f'/api/v1/titles/?{query}')
+    assert response.status_code == 200
+    return sorted(title['year'] for title in response.json()['results'])
+
+
+@pytest.mark.django_db
+class TestTitleFilter:
+
+    @pytest.mark.parametrize('query, expected', (
+        ('year=1994', [1994]),
+        ('year=199', []),
+        ('year_min=1994', [1994, 1999, 2010]),
+        ('year_max=1994', [1972, 1994]),
+        ('year_min=1990&year_max=2000', [1994, 1999]),
+        ('year_in=1972,2010', [1972, 2010]),
+    ))
+    def test_year(self, api_client, titles, query, expected):
+        assert years(api_client, query) == expected
+
+    @pytest.mark.parametrize('query, expected', (
+        ('category=films', [1972, 1994]),
+        ('category_contains=film', [1972, 1994, 1999, 2010]),
+        ('genre=drama', [1972, 1999]),
+        ('genre_contains=drama', [1972, 1994, 1999, 2010]),
+    ))
+    def test_slug(self, api_client, titles, query, expected):
+        assert years(api_client, query) == expected
+
+    def test_year_is_compared_as_integer(self, api_client, titles):
+        with CaptureQueriesContext(connection) as captured:
+            api_client.get('/api/v1/titles/?year=1994')
+        assert not any(
+            'LIKE' in query['sql'] for query in captured.captured_queries
+        )
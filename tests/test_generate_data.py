@@ -0,0 +1,94 @@
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db.models import Count
+
+from reviews.management.commands.generate_data import zipf_counts
+from reviews.models import Comment, Genre, Review, Title
+from users.models import User
+
+SCALE = (
+    '--users', '20', '--categories', '2', '--genres', '4',
+    '--titles', '15', '--reviews', '120', '--comments', '60',
+    '--batch-size', '7',
+)
+
+
+def generate(*args):
+    call_command('generate_data', *SCALE, *args, stdout=StringIO())
+
+
+class TestZipfCounts:
+
+    def test_total_and_order(self):
+        counts = zipf_counts(1000, 50, 1.1, 1000)
+        assert sum(counts) == 1000
+        assert counts == sorted(counts, reverse=True)
+        assert counts[0] > 10 * counts[-1]
+
+    def test_cap(self):
+        counts = zipf_counts(300, 10, 2.0, 40)
+        assert sum(counts) == 300
+        assert max(counts) == 40
+
+    def test_too_many_reviews(self):
+        with pytest.raises(CommandError):
+            zipf_counts(101, 10, 1.1, 10)
+
+
+@pytest.mark.django_db
+class TestGenerateData:
+
+    def test_counts(self):
+        generate()
+        assert User.objects.count() == 20
+        assert Genre.objects.count() == 4
+        assert Title.objects.count() == 15
+        assert Review.objects.count() == 120
+        assert Comment.objects.count() == 60
+        assert not Title.objects.filter(genre=None).exists()
+
+    def test_reviews(self):
+        generate()
+        assert not Review.objects.values('title', 'author').annotate(
+            count=Count('id'),
+        ).filter(count__gt=1).exists()
+        assert set(
+            Review.objects.values_list('score', flat=True)
+        ) <= set(range(1, 11))
+        title = Title.objects.order_by('-reviews_count').first()
+        assert title.reviews_count == title.reviews.count()
+        assert title.rating is not None
+
+    def test_comments_after_review(self):
+        generate()
+        for comment in Comment.objects.select_related('review'):
+            assert comment.pub_date >= comment.review.pub_date
+
+    def test_seed(self):
+        generate('--seed', '3')
+        first = self.relative_reviews()
+        generate('--seed', '3')
+        assert self.relative_reviews() == first
+        generate('--seed', '4')
+        assert self.relative_reviews() != first
+
+    @staticmethod
+    def relative_reviews():
+        """Отзывы последнего запуска с id относительно его начала."""
+        title = Title.objects.latest('pk').pk - 14
+        user = User.objects.latest('pk').pk - 19
+        return [
+            (review.title_id - title, review.author_id - user, review.score)
+            for review in Review.objects.filter(title__gte=title)
+            .order_by('pk')
+        ]
+
+    def test_repeated_runs(self):
+        generate()
+        generate()
+        assert User.objects.count() == 40
+        assert Review.objects.count() == 240
+        user = User.objects.create(username='new', email='new@yamdb.test')
+        assert user.pk > User.objects.exclude(pk=user.pk).latest('pk').pk
@@ -0,0 +1,114 @@
+import multiprocessing
+import os
+import runpy
+from types import SimpleNamespace
+
+import pytest
+
+from api_yamdb import settings
+
+CONFIG = os.path.join(settings.BASE_DIR, 'gunicorn.conf.py')
+
+
+def load_config(monkeypatch, **env):
+    for name in list(os.environ):
+        if name.startswith('GUNICORN_'):
+            monkeypatch.delenv(name)
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    return runpy.run_path(CONFIG)
+
+
+class FakeLog:
+    def __init__(self):
+        self.messages = []
+
+    def warning(self, message, *args):
+        self.messages.append(message % args)
+
+    info = warning
+
+
+class TestGunicornConfig:
+
+    def test_defaults(self, monkeypatch):
+        config = load_config(monkeypatch)
+        assert config['workers'] == multiprocessing.cpu_count() * 2 + 1
+        assert config['threads'] == 2
+        assert config['worker_class'] == 'gthread'
+        assert config['preload_app'] is True
+        assert config['max_requests'] > 0
+        assert config['max_requests_jitter'] > 0
+        assert config['keepalive'] > 0
+
+    def test_env_overrides(self, monkeypatch):
+        config = load_config(
+            monkeypatch,
+            GUNICORN_WORKERS='3',
+            GUNICORN_THREADS='1',
+            GUNICORN_PRELOAD='false',
+            GUNICORN_BIND='127.0.0.1:9000',
+        )
+        assert config['workers'] == 3
+        assert config['worker_class'] == 'sync'
+        assert config['preload_app'] is False
+        assert config['bind'] == '127.0.0.1:9000'
+
+    def test_request_timing_hooks(self, monkeypatch):
+        config = load_config(monkeypatch, GUNICORN_SLOW_REQUEST_MS='0')
+        worker = SimpleNamespace(pid=1, log=FakeLog())
+        server = SimpleNamespace(log=FakeLog())
+        request = SimpleNamespace(method='GET', path='/api/v1/genres/')
+        config['post_fork'](server, worker)
+        for _ in range(2):
+            config['pre_request'](worker, request)
+            config['post_request'](worker, request, {}, None)
+        assert worker.requests_served == 2
+        assert len(worker.log.messages) == 2
+        config['worker_exit'](server, worker)
+        assert 'запросов 2' in server.log.messages[0]
+
+    @pytest.mark.parametrize('value', ('1', 'true', 'yes', 'TRUE'))
+    def test_env_bool(self, monkeypatch, value):
+        config = load_config(monkeypatch, GUNICORN_PRELOAD=value)
+        assert config['preload_app'] is True
+
+    @pytest.mark.parametrize('workers, shared, refused', (
+        (3, False, True),
+        (1, False, False),
+        (3, True, False),
+    ))
+    def test_local_cache_with_workers(
+            self, monkeypatch, settings, workers, shared, refused,
+    ):
+        config = load_config(monkeypatch)
+        settings.SHARED_CACHE = shared
+        server = SimpleNamespace(
+            cfg=SimpleNamespace(workers=workers), log=FakeLog(),
+        )
+        if refused:
+            with pytest.raises(RuntimeError, match='CACHE_BACKEND'):
+                config['on_starting'](server)
+        else:
+            config['on_starting'](server)
+
+    def test_metrics_dir_is_cleared(self, monkeypatch, settings, tmp_path):
+        config = load_config(monkeypatch)
+        settings.SHARED_CACHE = True
+        settings.METRICS_DIR = str(tmp_path)
+        (tmp_path / '1.json').write_text('{}')
+        server = SimpleNamespace(cfg=SimpleNamespace(workers=3), log=FakeLog())
+        config['on_starting'](server)
+        assert not list(tmp_path.iterdir())
+        assert not server.log.messages
+        config['worker_exit'](server, SimpleNamespace(pid=1))
+        assert (tmp_path / f'{os.getpid()}.json').exists()
+
+    def test_workers_without_metrics_dir(self, monkeypatch, settings):
+        config = load_config(monkeypatch)
+        settings.SHARED_CACHE = True
+        settings.METRICS_DIR = ''
+        settings.METRICS_SAMPLE_RATE = 0.05
+        server = SimpleNamespace(cfg=SimpleNamespace(workers=3), log=FakeLog())
+        config['on_starting'](server)
+        assert 'METRICS_DIR' in server.log.messages[0]
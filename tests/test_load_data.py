@@ -0,0 +1,80 @@
+import csv
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from reviews.models import Comment, Review, Title
+from users.models import User
+
+DATA = {
+    'users.csv': [
+        ('id', 'username', 'email', 'role', 'bio', 'first_name', 'last_name'),
+        (100, 'bingobongo', 'bingo@yamdb.fake', 'user', '', '', ''),
+        (101, 'capt_obvious', 'capt@yamdb.fake', 'admin', '', '', ''),
+    ],
+    'category.csv': [('id', 'name', 'slug'), (1, 'Фильм', 'movie')],
+    'genre.csv': [
+        ('id', 'name', 'slug'), (1, 'Драма', 'drama'), (2, 'Комедия', 'comedy'),
+    ],
+    'titles.csv': [
+        ('id', 'name', 'year', 'category'),
+        (1, 'Побег из Шоушенка', 1994, 1),
+        (2, 'Крестный отец', 1972, 1),
+    ],
+    'genre_title.csv': [
+        ('id', 'title_id', 'genre_id'), (1, 1, 1), (2, 1, 2), (3, 2, 1),
+    ],
+    'review.csv': [
+        ('id', 'title_id', 'text', 'author', 'score', 'pub_date'),
+        (1, 1, 'Отлично', 100, 10, '2019-09-24T21:08:21.567Z'),
+        (2, 1, 'Хорошо', 101, 8, '2019-09-24T21:08:21.567Z'),
+        (3, 2, 'Неплохо', 100, 6, '2019-09-24T21:08:21.567Z'),
+    ],
+    'comments.csv': [
+        ('id', 'review_id', 'text', 'author', 'pub_date'),
+        (1, 1, 'Согласен', 101, '2019-09-24T21:08:21.567Z'),
+    ],
+}
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    for filename, rows in DATA.items():
+        with open(tmp_path / filename, 'w', encoding='utf-8', newline='') as f:
+            csv.writer(f).writerows(rows)
+    return tmp_path
+
+
+@pytest.mark.django_db
+class TestLoadData:
+
+    def test_loads_all_tables(self, data_dir):
+        call_command('load_data', '--path', data_dir, '--batch-size', '2')
+        assert User.objects.count() == 2
+        assert set(
+            Title.objects.get(pk=1).genre.values_list('slug', flat=True)
+        ) == {'drama', 'comedy'}
+        review = Review.objects.get(pk=1)
+        assert review.author.username == 'bingobongo'
+        assert review.pub_date.year == 2019
+        assert Comment.objects.get().author_id == 101
+        title = Title.objects.get(pk=1)
+        assert title.rating == 9
+        assert title.reviews_count == 2
+
+    def test_resume_from_offset(self, data_dir):
+        call_command('load_data', '--path', data_dir)
+        Review.objects.filter(pk__gt=1).delete()
+        Comment.objects.all().delete()
+        call_command(
+            'load_data', '--path', data_dir, '--table', 'review',
+            '--offset', '1',
+        )
+        assert Review.objects.count() == 3
+        assert Comment.objects.count() == 1
+
+    def test_failed_table_is_rolled_back(self, data_dir):
+        call_command('load_data', '--path', data_dir, '--table', 'users')
+        with pytest.raises(CommandError, match='--table users --offset 0'):
+            call_command('load_data', '--path', data_dir, '--table', 'users')
+        assert User.objects.count() == 2
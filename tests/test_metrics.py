@@ -0,0 +1,128 @@
+import os
+import re
+
+import pytest
+from django.db import connection
+from django.http import HttpResponse
+from django.test.utils import CaptureQueriesContext
+
+from api.metrics import REGISTRY, Histogram, Registry, RequestSample
+from reviews.models import Genre
+
+
+@pytest.fixture
+def registry():
+    REGISTRY.reset()
+    yield REGISTRY
+    REGISTRY.reset()
+
+
+def metric(text, name, **labels):
+    selector = ','.join(f'{key}="{value}"' for key, value in labels.items())
+    match = re.search(
+        rf'^{name}{{{re.escape(selector)}}} (\S+)$', text, re.MULTILINE,
+    )
+    return float(match.group(1)) if match else None
+
+
+def record(registry):
+    sample = RequestSample()
+    sample.finish(HttpResponse('{}'))
+    registry.record('genres-list', 'GET', sample)
+
+
+def requests_count(registry):
+    return metric(
+        registry.render(), 'yamdb_request_duration_seconds_count',
+        route='genres-list', method='GET',
+    )
+
+
+@pytest.mark.django_db
+class TestMetricsMiddleware:
+
+    def test_sampled_request_is_recorded(
+            self, settings, registry, api_client, admin_client,
+    ):
+        settings.METRICS_SAMPLE_RATE = 1
+        Genre.objects.create(name='Драма', slug='drama')
+        with CaptureQueriesContext(connection) as captured:
+            response = api_client.get('/api/v1/genres/')
+        assert response.status_code == 200
+        queries = len(captured)
+        text = admin_client.get('/api/v1/metrics/').content.decode()
+        labels = {'route': 'genres-list', 'method': 'GET'}
+        assert metric(
+            text, 'yamdb_request_duration_seconds_count', **labels,
+        ) == 1
+        assert metric(
+            text, 'yamdb_request_db_queries_sum', **labels,
+        ) == queries
+        assert metric(
+            text, 'yamdb_response_size_bytes_sum', **labels,
+        ) == len(response.content)
+        assert metric(
+            text, 'yamdb_request_render_duration_seconds_sum', **labels,
+        ) > 0
+
+    def test_disabled_sampling_records_nothing(
+            self, settings, registry, api_client,
+    ):
+        settings.METRICS_SAMPLE_RATE = 0
+        api_client.get('/api/v1/genres/')
+        assert 'genres-list' not in registry.render()
+
+    def test_metrics_admin_only(self, api_client, user_client, admin_client):
+        assert api_client.get('/api/v1/metrics/').status_code == 401
+        assert user_client.get('/api/v1/metrics/').status_code == 403
+        response = admin_client.get('/api/v1/metrics/')
+        assert response.status_code == 200
+        assert response['Content-Type'].startswith('text/plain')
+
+
+class TestRegistry:
+
+    def test_sums_worker_files(self, settings, tmp_path, registry):
+        settings.METRICS_DIR = str(tmp_path)
+        worker = Registry()
+        record(worker)
+        (tmp_path / f'{os.getpid()}.json').rename(tmp_path / '1.json')
+        record(registry)
+        assert requests_count(registry) == 2
+        assert requests_count(worker) == 2
+
+    def test_reused_pid_continues_counts(self, settings, tmp_path, registry):
+        settings.METRICS_DIR = str(tmp_path)
+        record(Registry())
+        record(registry)
+        assert requests_count(registry) == 2
+        assert len(list(tmp_path.glob('*.json'))) == 1
+
+    def test_without_directory(self, settings, registry):
+        settings.METRICS_DIR = ''
+        record(Registry())
+        record(registry)
+        assert requests_count(registry) == 1
+
+    def test_fork_starts_empty(self, registry):
+        record(registry)
+        registry.after_fork()
+        assert requests_count(registry) is None
+
+
+class TestHistogram:
+
+    def test_prometheus_text(self):
+        histogram = Histogram('latency', 'Задержка.', (0.1, 1))
+        for value in (0.05, 0.5, 5):
+            histogram.observe(('titles-list', 'GET'), value)
+        lines = list(histogram.render(('route', 'method')))
+        labels = 'route="titles-list",method="GET"'
+        assert lines[:2] == [
+            '# HELP latency Задержка.', '# TYPE latency histogram',
+        ]
+        assert f'latency_bucket{{{labels},le="0.1"}} 1' in lines
+        assert f'latency_bucket{{{labels},le="1.0"}} 2' in lines
+        assert f'latency_bucket{{{labels},le="+Inf"}} 3' in lines
+        assert f'latency_count{{{labels}}} 3' in lines
+        assert f'latency_sum{{{labels}}} 5.55' in lines
@@ -0,0 +1,129 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Comment, Review, Title
+
+
+@pytest.fixture
+def titles():
+    return (
+        Title.objects.create(name='Первое', year=2000),
+        Title.objects.create(name='Второе', year=2001),
+    )
+
+
+@pytest.fixture
+def review(titles, user):
+    review = Review.objects.create(
+        title=titles[0], author=user, text='Отзыв', score=7,
+    )
+    Comment.objects.create(review=review, author=user, text='Комментарий')
+    return review
+
+
+def parent_lookups(captured):
+    """Выборки произведения или отзыва по id из адреса."""
+    return [
+        query['sql'] for query in captured.captured_queries
+        if query['sql'].startswith('SELECT') and (
+            'WHERE "reviews_title"."id" =' in query['sql']
+            or '"reviews_review"."id" =' in query['sql']
+        )
+    ]
+
+
+@pytest.mark.django_db
+class TestNestedRoutes:
+
+    def test_review_of_other_title_not_found(
+            self, api_client, user_client, titles, review,
+    ):
+        url = f'/api/v1/titles/{titles[1].pk}/reviews/{review.pk}/comments/'
+        assert api_client.get(url).status_code == 404
+        response = user_client.post(url, {'text': 'Комментарий'})
+        assert response.status_code == 404
+        assert Comment.objects.filter(review=review).count() == 1
+
+    def test_comment_create_loads_parents_once(
+            self, user_client, titles, review,
+    ):
+        url = f'/api/v1/titles/{titles[0].pk}/reviews/{review.pk}/comments/'
+        with CaptureQueriesContext(connection) as captured:
+            response = user_client.post(url, {'text': 'Ещё один'})
+        assert response.status_code == 201
+        assert len(parent_lookups(captured)) == 1
+
+    def test_review_create_loads_title_once(
+            self, api_client, titles, django_user_model,
+    ):
+        author = django_user_model.objects.create(
+            username='author', email='author@yamdb.fake',
+        )
+        api_client.force_authenticate(author)
+        url = f'/api/v1/titles/{titles[1].pk}/reviews/'
+        with CaptureQueriesContext(connection) as captured:
+            response = api_client.post(url, {'text': 'Отзыв', 'score': 9})
+        assert response.status_code == 201
+        assert response.data['title'] == titles[1].name
+        assert len(parent_lookups(captured)) == 1
+
+
+@pytest.fixture
+def crowded_review(titles, django_user_model):
+    django_user_model.objects.bulk_create(
+        django_user_model(username=f'user{i}', email=f'user{i}@yamdb.fake')
+        for i in range(50)
+    )
+    authors = list(
+        django_user_model.objects.filter(username__startswith='user'),
+    )
+    Review.objects.bulk_create(
+        Review(title=titles[0], author=author, text='Отзыв', score=5)
+        for author in authors
+    )
+    review = Review.objects.filter(title=titles[0]).first()
+    Comment.objects.bulk_create(
+        Comment(review=review, author=author, text='Комментарий')
+        for author in authors
+    )
+    return review
+
+
+@pytest.mark.django_db
+class TestNestedSerializers:
+
+    def count_queries(self, client, url):
+        with CaptureQueriesContext(connection) as captured:
+            response = client.get(url)
+        assert response.status_code == 200
+        return len(captured), response.data['results']
+
+    @pytest.mark.parametrize('limit', (5, 50))
+    def test_list_queries_do_not_grow(
+            self, api_client, titles, crowded_review, limit,
+    ):
+        review_url = f'/api/v1/titles/{titles[0].pk}/reviews/?limit={limit}'
+        comment_url = (
+            f'/api/v1/titles/{titles[0].pk}/reviews/'
+            f'{crowded_review.pk}/comments/?limit={limit}'
+        )
+        queries, reviews = self.count_queries(api_client, review_url)
+        assert len(reviews) == limit
+        assert queries == 3
+        queries, comments = self.count_queries(api_client, comment_url)
+        assert len(comments) == limit
+        assert queries == 3
+
+    def test_compact_renders_parent_id(
+            self, api_client, titles, crowded_review,
+    ):
+        url = f'/api/v1/titles/{titles[0].pk}/reviews/'
+        response = api_client.get(url)
+        assert response.data['results'][0]['title'] == titles[0].name
+        response = api_client.get(url, {'compact': 1})
+        assert response.data['results'][0]['title'] == titles[0].pk
+        response = api_client.get(
+            f'{url}{crowded_review.pk}/comments/', {'compact': 'true'},
+        )
+        assert response.data['results'][0]['review'] == crowded_review.pk
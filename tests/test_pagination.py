@@ -0,0 +1,106 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.pagination import PubDateCursorPagination
+from reviews.models import Comment, Review, Title
+
+
+@pytest.fixture
+def title(django_user_model):
+    title = Title.objects.create(name='Произведение', year=2000)
+    django_user_model.objects.bulk_create(
+        django_user_model(username=f'user{i}', email=f'user{i}@yamdb.fake')
+        for i in range(25)
+    )
+    Review.objects.bulk_create(
+        Review(title=title, author=author, text=f'Отзыв {i}', score=5)
+        for i, author in enumerate(django_user_model.objects.all())
+    )
+    return title
+
+
+@pytest.fixture
+def review(title, user):
+    review = Review.objects.filter(title=title).first()
+    Comment.objects.bulk_create(
+        Comment(review=review, author=user, text=f'Комментарий {i}')
+        for i in range(25)
+    )
+    return review
+
+
+def walk_cursor_pages(client, url, link='next'):
+    ids = []
+    while url:
+        with CaptureQueriesContext(connection) as captured:
+            response = client.get(url)
+        assert response.status_code == 200
+        assert not any(
+            'COUNT(' in query['sql'] for query in captured.captured_queries
+        ), 'Курсорная пагинация не должна считать записи'
+        data = response.json()
+        assert 'count' not in data
+        assert not any(
+            'OFFSET' in query['sql'] for query in captured.captured_queries
+        ), 'Страница выбирается условием по (pub_date, id)'
+        ids.extend(item['id'] for item in data['results'])
+        url = data[link]
+    return ids
+
+
+@pytest.mark.django_db
+class TestCursorPagination:
+
+    def test_reviews_cursor_pages(self, api_client, title):
+        ids = walk_cursor_pages(
+            api_client,
+            f'/api/v1/titles/{title.pk}/reviews/?pagination=cursor&limit=10',
+        )
+        assert ids == list(
+            Review.objects.order_by('pub_date', 'id').values_list(
+                'id', flat=True,
+            )
+        )
+
+    def test_comments_cursor_pages(self, api_client, title, review):
+        ids = walk_cursor_pages(
+            api_client,
+            f'/api/v1/titles/{title.pk}/reviews/{review.pk}/comments/'
+            '?pagination=cursor',
+        )
+        assert len(ids) == len(set(ids)) == 25
+
+    def test_same_pub_date_pages(self, api_client, title):
+        Review.objects.update(pub_date=Review.objects.first().pub_date)
+        url = f'/api/v1/titles/{title.pk}/reviews/?pagination=cursor&limit=10'
+        ids = walk_cursor_pages(api_client, url)
+        assert ids == sorted(Review.objects.values_list('id', flat=True))
+        last = api_client.get(url).json()['next']
+        last = api_client.get(api_client.get(last).json()['next']).json()
+        back = walk_cursor_pages(api_client, last['previous'], 'previous')
+        assert len(back) == len(set(back)) == 20
+
+    def test_cursor_page_size_is_limited(
+            self, monkeypatch, api_client, title,
+    ):
+        assert PubDateCursorPagination.max_page_size
+        monkeypatch.setattr(PubDateCursorPagination, 'max_page_size', 10)
+        response = api_client.get(
+            f'/api/v1/titles/{title.pk}/reviews/?pagination=cursor&limit=20',
+        )
+        assert len(response.json()['results']) == 10
+
+    def test_invalid_cursor(self, api_client, title):
+        response = api_client.get(
+            f'/api/v1/titles/{title.pk}/reviews/?cursor=cD14',
+        )
+        assert response.status_code == 404
+
+    def test_offset_pagination_is_default(self, api_client, title):
+        response = api_client.get(
+            f'/api/v1/titles/{title.pk}/reviews/?limit=10&offset=20',
+        )
+        data = response.json()
+        assert data['count'] == 25
+        assert len(data['results']) == 5
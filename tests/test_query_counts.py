@@ -0,0 +1,148 @@
+"""
+Бюджет SQL-запросов для каждого эндпоинта из api/urls.py.
+
+Клиенты аутентифицируются через force_authenticate, поэтому
+запрос пользователя при проверке JWT в бюджет не входит.
+Ответы каталога кэшируются, здесь считаются запросы при промахе кэша.
+Точки сохранения транзакции запросами не считаются.
+"""
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from reviews.models import Category, Comment, Genre, Review, Title
+
+TITLE = '/api/v1/titles/{title}/'
+REVIEWS = '/api/v1/titles/{title}/reviews/'
+REVIEW = '/api/v1/titles/{title}/reviews/{review}/'
+COMMENTS = '/api/v1/titles/{title}/reviews/{review}/comments/'
+COMMENT = '/api/v1/titles/{title}/reviews/{review}/comments/{comment}/'
+
+# (клиент, метод, адрес, данные, ожидаемый статус, максимум запросов)
+BUDGET = (
+    ('anon', 'post', '/api/v1/auth/signup/',
+     {'username': 'newuser', 'email': 'new@yamdb.fake'}, 200, 5),
+    ('anon', 'post', '/api/v1/auth/token/',
+     {'username': 'TestUser', 'confirmation_code': '{code}'}, 201, 2),
+    ('admin', 'get', '/api/v1/users/', None, 200, 2),
+    ('admin', 'post', '/api/v1/users/',
+     {'username': 'created', 'email': 'created@yamdb.fake'}, 201, 4),
+    ('admin', 'get', '/api/v1/users/TestUser/', None, 200, 1),
+    ('admin', 'patch', '/api/v1/users/TestUser/', {'bio': 'Био'}, 200, 4),
+    ('admin', 'delete', '/api/v1/users/Other/', None, 204, 11),
+    ('user', 'get', '/api/v1/users/me/', None, 200, 0),
+    ('user', 'patch', '/api/v1/users/me/', {'bio': 'Био'}, 200, 3),
+    ('anon', 'get', '/api/v1/categories/', None, 200, 2),
+    ('admin', 'post', '/api/v1/categories/',
+     {'name': 'Книги', 'slug': 'books'}, 201, 2),
+    ('admin', 'delete', '/api/v1/categories/films/', None, 204, 4),
+    ('anon', 'get', '/api/v1/genres/', None, 200, 2),
+    ('admin', 'post', '/api/v1/genres/',
+     {'name': 'Комедия', 'slug': 'comedy'}, 201, 2),
+    ('admin', 'delete', '/api/v1/genres/drama/', None, 204, 4),
+    ('anon', 'get', '/api/v1/titles/', None, 200, 3),
+    ('anon', 'get', '/api/v1/titles/search/?q=фильм', None, 200, 4),
+    ('anon', 'get', TITLE, None, 200, 2),
+    ('admin', 'post', '/api/v1/titles/',
+     {'name': 'Новый', 'year': 2000, 'category': 'films',
+      'genre': ['drama']}, 201, 7),
+    ('admin', 'patch', TITLE, {'name': 'Другое'}, 200, 4),
+    ('admin', 'delete', TITLE, None, 204, 10),
+    ('anon', 'get', REVIEWS, None, 200, 3),
+    ('other', 'post', REVIEWS, {'text': 'Отзыв', 'score': 5}, 201, 4),
+    ('anon', 'get', REVIEW, None, 200, 2),
+    ('user', 'patch', REVIEW, {'text': 'Изменён'}, 200, 4),
+    ('user', 'delete', REVIEW, None, 204, 6),
+    ('anon', 'get', COMMENTS, None, 200, 3),
+    ('other', 'post', COMMENTS, {'text': 'Комментарий'}, 201, 3),
+    ('anon', 'get', COMMENT, None, 200, 2),
+    ('user', 'patch', COMMENT, {'text': 'Изменён'}, 200, 3),
+    ('user', 'delete', COMMENT, None, 204, 3),
+    ('admin', 'get', '/api/v1/export/titles/', None, 200, 2),
+    ('admin', 'get', '/api/v1/metrics/', None, 200, 0),
+)
+
+
+@pytest.fixture
+def other(django_user_model):
+    return django_user_model.objects.create(
+        username='Other', email='other@yamdb.fake',
+    )
+
+
+@pytest.fixture
+def objects(user, other):
+    category = Category.objects.create(name='Фильмы', slug='films')
+    genre = Genre.objects.create(name='Драма', slug='drama')
+    titles = []
+    for i in range(3):
+        title = Title.objects.create(
+            name=f'Фильм {i}', year=2000, category=category,
+        )
+        title.genre.add(genre)
+        titles.append(title)
+    title = titles[0]
+    review = Review.objects.create(
+        title=title, author=user, text='Отзыв', score=8,
+    )
+    Review.objects.create(
+        title=titles[1], author=other, text='Отзыв', score=6,
+    )
+    comment = Comment.objects.create(
+        review=review, author=user, text='Комментарий',
+    )
+    Comment.objects.create(review=review, author=other, text='Комментарий')
+    return {
+        'title': title.pk,
+        'review': review.pk,
+        'comment': comment.pk,
+        'code': user.confirmation_code,
+    }
+
+
+@pytest.fixture
+def clients(api_client, user_client, admin_client, other):
+    other_client = APIClient()
+    other_client.force_authenticate(other)
+    return {
+        'anon': api_client,
+        'user': user_client,
+        'other': other_client,
+        'admin': admin_client,
+    }
+
+
+def render(value, objects):
+    if isinstance(value, str):
+        return value.format(**objects)
+    if isinstance(value, dict):
+        return {key: render(item, objects) for key, item in value.items()}
+    if isinstance(value, list):
+        return [render(item, objects) for item in value]
+    return value
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    'client_name, method, url, data, status_code, max_queries',
+    BUDGET,
+    ids=[f'{method} {url}' for _, method, url, *_ in BUDGET],
+)
+def test_query_budget(
+        clients, objects, client_name, method, url, data, status_code,
+        max_queries,
+):
+    client = clients[client_name]
+    url = render(url, objects)
+    data = render(data, objects)
+    with CaptureQueriesContext(connection) as captured:
+        response = getattr(client, method)(url, data, format='json')
+        if hasattr(response, 'streaming_content'):
+            b''.join(response.streaming_content)
+    assert response.status_code == status_code, response.content
+    queries = [
+        query['sql'] for query in captured.captured_queries
+        if 'SAVEPOINT' not in query['sql']
+    ]
+    assert len(queries) <= max_queries, '\n'.join(queries)
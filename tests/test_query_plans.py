@@ -0,0 +1,161 @@
+"""
+Планы запросов эндпоинтов на заполненной базе.
+
+Каждый запрос к базе, выполненный при обработке HTTP-запроса,
+проверяется через EXPLAIN: отзывы, комментарии и связи
+произведений с жанрами не должны читаться целиком.
+"""
+import json
+import re
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Comment, Review, Title
+
+LARGE_TABLES = ('reviews_review', 'reviews_comment', 'reviews_title_genre')
+
+SQLITE_SCAN = re.compile(r'^SCAN (?:TABLE )?(\w+)')
+
+
+def full_scans(sql: str, tables, connection, params=None) -> list:
+    """
+    Таблицы из tables, которые запрос читает целиком.
+
+    На SQLite полным считается любой SCAN, в том числе по индексу.
+    На PostgreSQL последовательное чтение запрещается настройкой
+    enable_seqscan, и Seq Scan в плане означает, что подходящего
+    индекса нет: на маленькой тестовой базе иначе планировщик
+    выбирает его всегда.
+    """
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            details = [row[-1] for row in cursor.fetchall()]
+        scanned = [SQLITE_SCAN.match(detail) for detail in details]
+        return [
+            match.group(1) for match in scanned
+            if match and match.group(1) in tables
+        ]
+    if connection.vendor == 'postgresql':
+        # Внутри внешней транзакции SET LOCAL переживает точку
+        # сохранения, поэтому настройка сбрасывается явно.
+        with transaction.atomic(using=connection.alias):
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+                cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+                plan = cursor.fetchone()[0]
+                cursor.execute('RESET enable_seqscan')
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        nodes = [plan[0]['Plan']]
+        scanned = []
+        while nodes:
+            node = nodes.pop()
+            nodes.extend(node.get('Plans', ()))
+            if node['Node Type'] == 'Seq Scan' and (
+                    node['Relation Name'] in tables
+            ):
+                scanned.append(node['Relation Name'])
+        return scanned
+    return []
+
+TITLE = '/api/v1/titles/{title}/'
+REVIEWS = '/api/v1/titles/{title}/reviews/'
+REVIEW = '/api/v1/titles/{title}/reviews/{review}/'
+COMMENTS = '/api/v1/titles/{title}/reviews/{review}/comments/'
+COMMENT = '/api/v1/titles/{title}/reviews/{review}/comments/{comment}/'
+
+# (клиент, метод, адрес, ожидаемый статус)
+ENDPOINTS = (
+    ('anon', 'get', '/api/v1/titles/', 200),
+    ('anon', 'get', '/api/v1/titles/?genre=genre-2', 200),
+    ('anon', 'get', '/api/v1/titles/?category=category-1', 200),
+    ('anon', 'get', '/api/v1/titles/?year=2000', 200),
+    ('anon', 'get', '/api/v1/titles/search/?q=Произведение', 200),
+    ('anon', 'get', TITLE, 200),
+    ('anon', 'get', REVIEWS, 200),
+    ('anon', 'get', REVIEWS + '?pagination=cursor', 200),
+    ('anon', 'get', REVIEW, 200),
+    ('anon', 'get', COMMENTS, 200),
+    ('anon', 'get', COMMENTS + '?pagination=cursor', 200),
+    ('anon', 'get', COMMENT, 200),
+    ('admin', 'delete', REVIEW, 204),
+    ('admin', 'delete', TITLE, 204),
+    ('admin', 'delete', '/api/v1/users/{username}/', 204),
+)
+
+
+@pytest.fixture
+def seeded():
+    call_command(
+        'generate_data',
+        users=30,
+        categories=3,
+        genres=6,
+        titles=100,
+        reviews=1500,
+        comments=1500,
+        stdout=StringIO(),
+    )
+    with connection.cursor() as cursor:
+        # Без статистики планировщик оценивает таблицы как пустые.
+        cursor.execute('ANALYZE')
+    title = Title.objects.order_by('-reviews_count').first()
+    review = title.reviews.annotate(
+        comments_total=Count('comments'),
+    ).order_by('-comments_total').first()
+    return {
+        'title': title.pk,
+        'review': review.pk,
+        'comment': review.comments.first().pk,
+        'username': review.author.username,
+    }
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    'client_name, method, url, status_code',
+    ENDPOINTS,
+    ids=[f'{method} {url}' for _, method, url, _ in ENDPOINTS],
+)
+def test_no_full_scans(
+        seeded, api_client, admin_client, client_name, method, url,
+        status_code,
+):
+    client = {'anon': api_client, 'admin': admin_client}[client_name]
+    with CaptureQueriesContext(connection) as captured:
+        response = getattr(client, method)(url.format(**seeded))
+    assert response.status_code == status_code, response.content
+    scans = {
+        query['sql']: full_scans(query['sql'], LARGE_TABLES, connection)
+        for query in captured.captured_queries
+        if query['sql'].lstrip().startswith(('SELECT', 'DELETE', 'UPDATE'))
+    }
+    assert not any(scans.values()), '\n'.join(
+        f'{tables}: {sql}' for sql, tables in scans.items() if tables
+    )
+
+
+@pytest.mark.django_db
+class TestFullScans:
+
+    def test_detects_scan(self, seeded):
+        queryset = Review.objects.filter(text__contains='Отзыв')
+        sql, params = queryset.query.sql_with_params()
+        assert full_scans(sql, LARGE_TABLES, connection, params) == [
+            'reviews_review',
+        ]
+
+    def test_author_index(self, seeded):
+        author = Review.objects.values_list('author', flat=True)[0]
+        for model in (Review, Comment):
+            queryset = model.objects.filter(author=author).order_by(
+                'pub_date', 'id',
+            )
+            sql, params = queryset.query.sql_with_params()
+            assert not full_scans(sql, LARGE_TABLES, connection, params)
@@ -0,0 +1,81 @@
+import json
+
+import pytest
+
+from api.querycheck import RepeatedQueriesError, fingerprint
+from api.views import ReviewViewSet
+from reviews.models import Review, Title
+
+
+@pytest.fixture
+def title(django_user_model):
+    title = Title.objects.create(name='Произведение', year=2000)
+    django_user_model.objects.bulk_create(
+        django_user_model(username=f'user{i}', email=f'user{i}@yamdb.fake')
+        for i in range(10)
+    )
+    Review.objects.bulk_create(
+        Review(title=title, author=author, text='Отзыв', score=5)
+        for author in django_user_model.objects.all()
+    )
+    return title
+
+
+@pytest.fixture
+def n_plus_one(monkeypatch):
+    """Список отзывов без select_related: автор загружается по одному."""
+    monkeypatch.setattr(
+        ReviewViewSet,
+        'get_queryset',
+        lambda view: Review.objects.filter(title_id=view.kwargs['title_id']),
+    )
+
+
+class TestFingerprint:
+
+    def test_literals_are_replaced(self):
+        assert fingerprint(
+            "SELECT * FROM t WHERE id = 15 AND name = 'it''s'",
+        ) == fingerprint("SELECT * FROM t WHERE id = 7 AND name = 'x'")
+
+    def test_in_lists_are_collapsed(self):
+        assert fingerprint('SELECT * FROM t WHERE id IN (1, 2, 3)') == (
+            'SELECT * FROM t WHERE id IN (...)'
+        )
+
+
+@pytest.mark.django_db
+class TestQueryInspector:
+
+    def test_constant_queries_pass(self, api_client, title):
+        url = f'/api/v1/titles/{title.pk}/reviews/'
+        assert api_client.get(url).status_code == 200
+
+    def test_n_plus_one_fails(self, api_client, title, n_plus_one):
+        with pytest.raises(RepeatedQueriesError) as error:
+            api_client.get(f'/api/v1/titles/{title.pk}/reviews/')
+        repeated = json.loads(str(error.value))
+        origins = {
+            origin.get('field') for item in repeated
+            for origin in item['origins']
+        }
+        assert 'ReviewSerializer.author' in origins
+        assert all(item['count'] == 10 for item in repeated)
+
+    @pytest.mark.allow_repeated_queries
+    def test_report_written_to_file(
+            self, api_client, title, n_plus_one, settings, tmp_path,
+    ):
+        settings.QUERY_INSPECTOR = True
+        settings.QUERY_INSPECTOR_LOG_FILE = str(tmp_path / 'queries.log')
+        response = api_client.get(f'/api/v1/titles/{title.pk}/reviews/')
+        assert response.status_code == 200
+        report = json.loads(
+            (tmp_path / 'queries.log').read_text(encoding='utf-8'),
+        )
+        assert report['route'] == 'reviews-list'
+        assert report['repeated'][0]['count'] == 10
+        origin = report['repeated'][0]['origins'][0]
+        assert origin['view'] == 'ReviewViewSet.list'
+        assert origin['code'].startswith(settings.BASE_DIR)
+        assert origin['field'].startswith('ReviewSerializer.')
@@ -0,0 +1,113 @@
+import pytest
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Review, Title
+from reviews.ratings import (
+    deferred_rating_updates,
+    ratings_changed,
+    rebuild_ratings,
+)
+
+
+@pytest.fixture
+def title():
+    return Title.objects.create(name='Произведение', year=2000)
+
+
+@pytest.mark.django_db
+class TestTitleRating:
+
+    def test_rating_follows_reviews(self, title, user, admin):
+        review = Review.objects.create(
+            title=title, author=user, text='Отзыв', score=4,
+        )
+        Review.objects.create(title=title, author=admin, text='Отзыв', score=8)
+        title.refresh_from_db()
+        assert title.rating == 6
+        assert title.reviews_count == 2
+
+        review.score = 10
+        review.save()
+        title.refresh_from_db()
+        assert title.rating == 9
+
+        review.delete()
+        title.refresh_from_db()
+        assert title.rating == 8
+        assert title.reviews_count == 1
+
+    def test_review_moved_to_other_title(self, title, user, admin):
+        Review.objects.create(title=title, author=user, text='Отзыв', score=4)
+        Review.objects.create(title=title, author=admin, text='Отзыв', score=8)
+        other = Title.objects.create(name='Другое', year=2001)
+        review = Review.objects.get(title=title, author=user)
+        review.title = other
+        review.save()
+        title.refresh_from_db()
+        other.refresh_from_db()
+        assert (title.rating, title.reviews_count) == (8, 1)
+        assert (other.rating, other.reviews_count) == (4, 1)
+
+    def test_title_list_reads_stored_rating(self, api_client, title, user):
+        Review.objects.create(title=title, author=user, text='Отзыв', score=7)
+        with CaptureQueriesContext(connection) as captured:
+            response = api_client.get('/api/v1/titles/')
+        assert response.status_code == 200
+        assert response.json()['results'][0]['rating'] == 7
+        assert not any(
+            'reviews_review' in query['sql'] for query in captured.captured_queries
+        ), 'Список произведений не должен обращаться к таблице отзывов'
+
+    def test_update_ratings_command(self, title, user):
+        Review.objects.bulk_create([
+            Review(title=title, author=user, text='Отзыв', score=5),
+        ])
+        with pytest.raises(CommandError):
+            call_command('update_ratings', '--check')
+        call_command('update_ratings')
+        call_command('update_ratings', '--check')
+        title.refresh_from_db()
+        assert title.rating == 5
+        assert title.reviews_count == 1
+
+    def test_deferred_rating_updates(self, title, user, admin):
+        other = Title.objects.create(name='Другое', year=2001)
+        for item in (title, other):
+            Review.objects.create(
+                title=item, author=user, text='Отзыв', score=4,
+            )
+        Review.objects.create(title=title, author=admin, text='Отзыв', score=8)
+        with CaptureQueriesContext(connection) as captured:
+            with deferred_rating_updates():
+                user.delete()
+        updates = [
+            query for query in captured.captured_queries
+            if query['sql'].startswith('UPDATE "reviews_title"')
+        ]
+        assert len(updates) == 1
+        title.refresh_from_db()
+        other.refresh_from_db()
+        assert (title.rating, title.reviews_count) == (8, 1)
+        assert (other.rating, other.reviews_count) == (None, 0)
+
+    def test_rebuild_skips_titles_without_reviews(self, title, user):
+        Title.objects.create(name='Без отзывов', year=2001)
+        Review.objects.create(title=title, author=user, text='Отзыв', score=5)
+        Review.objects.bulk_create([
+            Review(title=Title.objects.create(name='Новое', year=2002),
+                   author=user, text='Отзыв', score=3),
+        ])
+        sent = []
+
+        def receiver(sender, title_ids, **kwargs):
+            sent.append(title_ids)
+
+        ratings_changed.connect(receiver)
+        try:
+            assert rebuild_ratings() == 1
+            assert rebuild_ratings() == 0
+        finally:
+            ratings_changed.disconnect(receiver)
+        assert len(sent) == 1
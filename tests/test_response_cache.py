@@ -0,0 +1,76 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Genre, Review, Title
+
+
+@pytest.fixture
+def title():
+    category = Category.objects.create(name='Фильмы', slug='films')
+    genre = Genre.objects.create(name='Драма', slug='drama')
+    title = Title.objects.create(name='Фильм', year=2000, category=category)
+    title.genre.add(genre)
+    return title
+
+
+@pytest.mark.django_db
+class TestResponseCache:
+
+    @pytest.mark.parametrize('url', (
+        '/api/v1/titles/',
+        '/api/v1/categories/',
+        '/api/v1/genres/',
+    ))
+    def test_repeated_reads_skip_database(self, api_client, title, url):
+        first = api_client.get(url)
+        with CaptureQueriesContext(connection) as captured:
+            second = api_client.get(url)
+        assert second.status_code == 200
+        assert second.json() == first.json()
+        assert len(captured) == 0
+
+    def test_retrieve_is_cached(self, api_client, title):
+        url = f'/api/v1/titles/{title.pk}/'
+        api_client.get(url)
+        with CaptureQueriesContext(connection) as captured:
+            response = api_client.get(url)
+        assert response.json()['name'] == 'Фильм'
+        assert len(captured) == 0
+
+    def test_query_string_is_normalized(self, api_client, title):
+        api_client.get('/api/v1/titles/?limit=5&offset=0')
+        with CaptureQueriesContext(connection) as captured:
+            api_client.get('/api/v1/titles/?offset=0&limit=5')
+        assert len(captured) == 0
+
+    def test_admin_writes_invalidate(self, api_client, admin_client, title):
+        api_client.get('/api/v1/genres/')
+        api_client.get('/api/v1/titles/')
+        admin_client.post(
+            '/api/v1/genres/', {'name': 'Комедия', 'slug': 'comedy'},
+        )
+        assert len(api_client.get('/api/v1/genres/').json()['results']) == 2
+
+        Genre.objects.filter(slug='drama').update(name='Мелодрама')
+        Genre.objects.get(slug='drama').save()
+        genres = api_client.get('/api/v1/titles/').json()['results'][0]['genre']
+        assert genres[0]['name'] == 'Мелодрама'
+
+        admin_client.patch(f'/api/v1/titles/{title.pk}/', {'name': 'Новое'})
+        response = api_client.get(f'/api/v1/titles/{title.pk}/')
+        assert response.json()['name'] == 'Новое'
+
+    def test_rating_change_invalidates_titles(self, api_client, title, user):
+        assert api_client.get('/api/v1/titles/').json()['results'][0][
+            'rating'] is None
+        Review.objects.create(title=title, author=user, text='Отзыв', score=9)
+        assert api_client.get('/api/v1/titles/').json()['results'][0][
+            'rating'] == 9
+
+    def test_unrelated_writes_keep_cache(self, api_client, title, user):
+        api_client.get('/api/v1/categories/')
+        Genre.objects.create(name='Комедия', slug='comedy')
+        with CaptureQueriesContext(connection) as captured:
+            api_client.get('/api/v1/categories/')
+        assert len(captured) == 0
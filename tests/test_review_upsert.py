@@ -0,0 +1,124 @@
+from types import SimpleNamespace
+
+import pytest
+from django.db import IntegrityError, connection
+from django.test.utils import CaptureQueriesContext
+
+from api.serializers import ReviewSerializer
+from reviews.models import (
+    Review,
+    ReviewQuerySet,
+    Title,
+    UNIQUE_REVIEW,
+    is_duplicate_review,
+)
+
+
+def foreign_key_error(*args, **kwargs):
+    raise IntegrityError('FOREIGN KEY constraint failed')
+
+
+class PostgreSQLError(Exception):
+    def __init__(self, constraint_name):
+        super().__init__(constraint_name)
+        self.diag = SimpleNamespace(constraint_name=constraint_name)
+
+
+def postgresql_error(constraint_name):
+    error = IntegrityError('duplicate key value')
+    error.__cause__ = PostgreSQLError(constraint_name)
+    return error
+
+
+@pytest.fixture
+def title():
+    return Title.objects.create(name='Произведение', year=2000)
+
+
+@pytest.mark.django_db
+class TestReviewCreate:
+
+    def url(self, title):
+        return f'/api/v1/titles/{title.pk}/reviews/'
+
+    def test_duplicate_review_rejected_by_constraint(self, user_client, title):
+        data = {'text': 'Отзыв', 'score': 5}
+        assert user_client.post(self.url(title), data).status_code == 201
+        with CaptureQueriesContext(connection) as captured:
+            response = user_client.post(self.url(title), data)
+        assert response.status_code == 400
+        assert response.data == {
+            'non_field_errors': ['Нельзя оставлять несколько отзывов'],
+        }
+        assert not any(
+            'EXISTS' in query['sql'] or 'LIMIT 1' in query['sql']
+            for query in captured.captured_queries
+        ), 'Проверка дубликата выполняется ограничением в базе'
+        assert Review.objects.filter(title=title).count() == 1
+
+    def test_upsert_creates_and_replaces_review(self, user_client, title):
+        url = f'{self.url(title)}?upsert=true'
+        response = user_client.post(url, {'text': 'Первый', 'score': 4})
+        assert response.status_code == 201
+        review_id = response.data['id']
+        assert response.data['title'] == title.name
+        response = user_client.post(url, {'text': 'Второй', 'score': 8})
+        assert response.status_code == 201
+        assert response.data['id'] == review_id
+        assert response.data['text'] == 'Второй'
+        review = Review.objects.get()
+        assert (review.text, review.score) == ('Второй', 8)
+        title.refresh_from_db()
+        assert (title.rating, title.reviews_count) == (8, 1)
+
+    def test_upsert_keeps_pub_date(self, user_client, title):
+        url = f'{self.url(title)}?upsert=1'
+        first = user_client.post(url, {'text': 'Первый', 'score': 4})
+        second = user_client.post(url, {'text': 'Второй', 'score': 5})
+        assert first.data['pub_date'] == second.data['pub_date']
+
+    def test_upsert_is_single_write(self, user_client, title):
+        url = f'{self.url(title)}?upsert=true'
+        user_client.post(url, {'text': 'Первый', 'score': 4})
+        with CaptureQueriesContext(connection) as captured:
+            response = user_client.post(url, {'text': 'Второй', 'score': 6})
+        assert response.status_code == 201
+        writes = [
+            query['sql'] for query in captured.captured_queries
+            if query['sql'].startswith('INSERT INTO "reviews_review"')
+        ]
+        assert len(writes) == 1
+
+    def test_upsert_validates_score(self, user_client, title):
+        url = f'{self.url(title)}?upsert=true'
+        response = user_client.post(url, {'text': 'Отзыв', 'score': 11})
+        assert response.status_code == 400
+        assert not Review.objects.exists()
+
+    @pytest.mark.parametrize('target, name, query', (
+        (ReviewSerializer, 'save', ''),
+        (ReviewQuerySet, 'upsert', '?upsert=true'),
+    ))
+    def test_other_integrity_errors_propagate(
+            self, monkeypatch, user_client, title, target, name, query,
+    ):
+        monkeypatch.setattr(target, name, foreign_key_error)
+        with pytest.raises(IntegrityError):
+            user_client.post(
+                f'{self.url(title)}{query}', {'text': 'Отзыв', 'score': 5},
+            )
+
+
+class TestDuplicateReview:
+
+    @pytest.mark.parametrize('constraint_name, duplicate', (
+        (UNIQUE_REVIEW, True),
+        ('reviews_review_author_id_fk_users_user_id', False),
+    ))
+    def test_postgresql_constraint_name(self, constraint_name, duplicate):
+        error = postgresql_error(constraint_name)
+        assert is_duplicate_review(error) is duplicate
+
+    def test_sqlite_other_unique_constraint(self):
+        error = IntegrityError('UNIQUE constraint failed: users_user.email')
+        assert not is_duplicate_review(error)
@@ -0,0 +1,52 @@
+import pytest
+
+from api.search import fts5_query
+from reviews.models import Category, Genre, Title
+
+
+@pytest.fixture
+def titles():
+    Title.objects.create(
+        name='Побег из Шоушенка', year=1994, description='Тюремная драма',
+    )
+    Title.objects.create(
+        name='Зеленая миля', year=1999, description='Драма по Стивену Кингу',
+    )
+    Title.objects.create(name='Крестный отец', year=1972)
+
+
+@pytest.mark.django_db
+class TestTitleSearch:
+
+    def test_search_endpoint_ranks_matches(self, api_client, titles):
+        response = api_client.get('/api/v1/titles/search/?q=драма')
+        assert response.status_code == 200
+        names = {title['name'] for title in response.json()['results']}
+        assert names == {'Побег из Шоушенка', 'Зеленая миля'}
+
+    def test_prefix_search(self, api_client, titles):
+        response = api_client.get('/api/v1/titles/search/?q=шоу')
+        results = response.json()['results']
+        assert [title['name'] for title in results] == ['Побег из Шоушенка']
+
+    def test_search_index_follows_updates(self, api_client, titles):
+        Title.objects.filter(name='Крестный отец').update(
+            description='Гангстерская драма',
+        )
+        response = api_client.get('/api/v1/titles/?search=гангстерская')
+        assert response.json()['count'] == 1
+
+    def test_empty_query_is_rejected(self, api_client):
+        assert api_client.get('/api/v1/titles/search/').status_code == 400
+
+    def test_genre_and_category_search(self, api_client):
+        Genre.objects.create(name='Драма', slug='drama')
+        Category.objects.create(name='Фильмы', slug='films')
+        genres = api_client.get('/api/v1/genres/?search=рам').json()
+        categories = api_client.get('/api/v1/categories/?search=ильм').json()
+        assert genres['count'] == 1
+        assert categories['count'] == 1
+
+
+def test_fts5_query_escapes_operators():
+    assert fts5_query('NEAR("x" OR y*') == '"NEAR"* "x"* "OR"* "y"*'
@@ -0,0 +1,139 @@
+import os
+import runpy
+
+import pytest
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework.views import APIView
+
+from api.authentication import (
+    RoleAccessToken,
+    StatelessJWTAuthentication,
+    UserPrincipal,
+    token_version,
+)
+from reviews.models import Title
+
+
+@pytest.fixture
+def stateless_auth(monkeypatch):
+    monkeypatch.setattr(
+        APIView, 'authentication_classes', (StatelessJWTAuthentication,),
+    )
+
+
+def token_client(user):
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {RoleAccessToken.for_user(user)}',
+    )
+    return client
+
+
+@pytest.mark.django_db
+class TestStatelessAuth:
+
+    def test_principal_from_claims(self, admin):
+        token = RoleAccessToken.for_user(admin)
+        principal = UserPrincipal(token)
+        assert principal.pk == admin.pk
+        assert principal.is_admin
+        assert not principal.is_moderator
+        assert principal == admin
+
+    def test_review_create_skips_user_query(self, monkeypatch, user, admin):
+        title = Title.objects.create(name='Произведение', year=2000)
+
+        def count_queries(author):
+            with CaptureQueriesContext(connection) as captured:
+                response = token_client(author).post(
+                    f'/api/v1/titles/{title.pk}/reviews/',
+                    {'text': 'Отзыв', 'score': 7},
+                )
+            assert response.status_code == 201, response.json()
+            assert response.json()['author'] == author.username
+            return len(captured)
+
+        with_user_query = count_queries(admin)
+        # Версия токенов читается из базы только при промахе кэша.
+        token_version(user.pk)
+        monkeypatch.setattr(
+            APIView, 'authentication_classes', (StatelessJWTAuthentication,),
+        )
+        assert count_queries(user) == with_user_query - 1
+
+    def test_admin_role_from_token(self, stateless_auth, admin):
+        response = token_client(admin).post(
+            '/api/v1/genres/', {'name': 'Драма', 'slug': 'drama'},
+        )
+        assert response.status_code == 201
+
+    def test_role_change_revokes_token(self, stateless_auth, admin):
+        client = token_client(admin)
+        assert client.get('/api/v1/users/').status_code == 200
+        admin.role = 'user'
+        admin.save()
+        assert client.get('/api/v1/users/').status_code == 401
+
+    def test_profile_update_keeps_token(self, stateless_auth, user):
+        client = token_client(user)
+        response = client.patch('/api/v1/users/me/', {'bio': 'Новое'})
+        assert response.status_code == 200
+        assert response.json()['bio'] == 'Новое'
+        assert client.get('/api/v1/users/me/').status_code == 200
+
+    def test_token_issued_after_revocation(self, stateless_auth, admin):
+        old = token_client(admin)
+        admin.role = 'moderator'
+        admin.save()
+        new = token_client(admin)
+        assert old.get('/api/v1/users/me/').status_code == 401
+        assert new.get('/api/v1/users/me/').status_code == 200
+
+    def test_revocation_after_version_expired(self, stateless_auth, admin):
+        admin.role = 'moderator'
+        admin.save()
+        client = token_client(admin)
+        assert client.get('/api/v1/users/me/').status_code == 200
+        # Ключ версии вытеснен из кэша между двумя отзывами.
+        cache.clear()
+        admin.role = 'user'
+        admin.save()
+        assert client.get('/api/v1/users/me/').status_code == 401
+        admin.refresh_from_db()
+        assert admin.token_version == 2
+
+    def test_deleted_user_after_cache_clear(self, stateless_auth, user):
+        client = token_client(user)
+        assert client.get('/api/v1/users/me/').status_code == 200
+        user.delete()
+        cache.clear()
+        assert client.get('/api/v1/users/me/').status_code == 401
+
+
+class TestStatelessAuthSettings:
+
+    def load_settings(self, monkeypatch, **env):
+        monkeypatch.delenv('CACHE_BACKEND', raising=False)
+        for name, value in env.items():
+            monkeypatch.setenv(name, value)
+        return runpy.run_path(
+            os.path.join(settings.BASE_DIR, 'api_yamdb', 'settings.py'),
+        )
+
+    def test_requires_shared_cache(self, monkeypatch):
+        with pytest.raises(ImproperlyConfigured):
+            self.load_settings(monkeypatch, JWT_STATELESS_AUTH='true')
+
+    def test_shared_cache(self, monkeypatch):
+        config = self.load_settings(
+            monkeypatch,
+            JWT_STATELESS_AUTH='true',
+            CACHE_BACKEND='django.core.cache.backends.memcached.'
+                          'PyMemcacheCache',
+        )
+        assert config['SHARED_CACHE']
@@ -0,0 +1,68 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Genre, Title
+
+# COUNT для пагинации, произведения с категориями и жанры одним запросом.
+LIST_QUERIES = 3
+# Произведение с категорией и жанры.
+RETRIEVE_QUERIES = 2
+
+
+@pytest.fixture
+def catalog():
+    def create(size):
+        Category.objects.bulk_create(
+            Category(name=f'Категория {i}', slug=f'category-{i}')
+            for i in range(5)
+        )
+        Genre.objects.bulk_create(
+            Genre(name=f'Жанр {i}', slug=f'genre-{i}') for i in range(5)
+        )
+        categories = list(Category.objects.all())
+        genres = list(Genre.objects.all())
+        Title.objects.bulk_create(
+            Title(
+                name=f'Произведение {i}',
+                year=2000,
+                category=categories[i % len(categories)],
+            )
+            for i in range(size)
+        )
+        titles = Title.objects.order_by('pk')
+        Title.genre.through.objects.bulk_create(
+            Title.genre.through(title=title, genre=genre)
+            for title in titles
+            for genre in genres[:2]
+        )
+        return titles.first()
+    return create
+
+
+@pytest.mark.django_db
+class TestTitleQueries:
+
+    @pytest.mark.parametrize('size', (10, 100, 1000))
+    def test_list_queries_do_not_grow(self, api_client, catalog, size):
+        catalog(size)
+        with CaptureQueriesContext(connection) as captured:
+            response = api_client.get(f'/api/v1/titles/?limit={size}')
+        assert response.status_code == 200
+        results = response.json()['results']
+        assert len(results) == size
+        assert all(
+            title['category'] and len(title['genre']) == 2 for title in results
+        )
+        assert len(captured) == LIST_QUERIES, (
+            f'Для {size} произведений выполнено {len(captured)} запросов'
+        )
+
+    @pytest.mark.parametrize('size', (10, 100, 1000))
+    def test_retrieve_queries(self, api_client, catalog, size):
+        title = catalog(size)
+        with CaptureQueriesContext(connection) as captured:
+            response = api_client.get(f'/api/v1/titles/{title.pk}/')
+        assert response.status_code == 200
+        assert len(response.json()['genre']) == 2
+        assert len(captured) == RETRIEVE_QUERIES